@@ -1,16 +1,196 @@
+import asyncio
+import base64
 import hashlib
+import hmac
+import json
+import os
 import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+
+# ── Passwords ────────────────────────────────────────────────────────────────
+# Stored as "scrypt$n$r$p$salt$hash" or "pbkdf2_sha256$iterations$salt$hash"
+# (base64 salt and hash). Hashes from before the KDF, "salt:hexsha256", are
+# still accepted and replaced on the next successful login.
+
+PASSWORD_KDF = os.environ.get("PASSWORD_KDF", "scrypt")  # "scrypt" | "pbkdf2"
+SCRYPT_N = int(os.environ.get("SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.environ.get("SCRYPT_R", "8"))
+SCRYPT_P = int(os.environ.get("SCRYPT_P", "1"))
+PBKDF2_ITERATIONS = int(os.environ.get("PBKDF2_ITERATIONS", "600000"))
+
+# Hashing takes tens of milliseconds, so the async helpers run it in a small
+# dedicated pool: logins queue there instead of blocking the event loop, and
+# at most KDF_WORKERS hashes run at once
+KDF_WORKERS = int(os.environ.get("KDF_WORKERS", "2"))
+_kdf_executor = ThreadPoolExecutor(max_workers=KDF_WORKERS, thread_name_prefix="kdf")
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r * p, dklen=32
+    )
+
+
+def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def _encode(salt: bytes, h: bytes) -> str:
+    if PASSWORD_KDF == "pbkdf2":
+        return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64(salt)}${_b64(h)}"
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(h)}"
 
 
 def hash_password(password: str) -> str:
-    salt = secrets.token_hex(16)
-    h = hashlib.sha256(f"{salt}{password}".encode()).hexdigest()
-    return f"{salt}:{h}"
+    salt = secrets.token_bytes(16)
+    if PASSWORD_KDF == "pbkdf2":
+        return _encode(salt, _pbkdf2(password, salt, PBKDF2_ITERATIONS))
+    return _encode(salt, _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P))
+
+
+# Checked when the username doesn't exist, so that takes as long as a wrong password
+DUMMY_HASH = _encode(bytes(16), bytes(32))
 
 
 def verify_password(password: str, stored: str) -> bool:
     try:
+        if stored.startswith("scrypt$"):
+            _, n, r, p, salt, h = stored.split("$")
+            computed = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+            return hmac.compare_digest(computed, base64.b64decode(h))
+        if stored.startswith("pbkdf2_sha256$"):
+            _, iterations, salt, h = stored.split("$")
+            computed = _pbkdf2(password, base64.b64decode(salt), int(iterations))
+            return hmac.compare_digest(computed, base64.b64decode(h))
         salt, h = stored.split(":", 1)
-        return hashlib.sha256(f"{salt}{password}".encode()).hexdigest() == h
+        return hmac.compare_digest(hashlib.sha256(f"{salt}{password}".encode()).hexdigest(), h)
     except Exception:
         return False
+
+
+def needs_rehash(stored: str) -> bool:
+    """True if ``stored`` wasn't made with the configured KDF and cost."""
+    if PASSWORD_KDF == "pbkdf2":
+        return not stored.startswith(f"pbkdf2_sha256${PBKDF2_ITERATIONS}$")
+    return not stored.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_kdf_executor, hash_password, password)
+
+
+async def verify_password_async(password: str, stored: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(
+        _kdf_executor, verify_password, password, stored
+    )
+
+
+# ── Admin sessions ───────────────────────────────────────────────────────────
+# Signed tokens "<payload>.<signature>" carrying user id, role and expiry, so
+# protected endpoints authorize without touching the database. Every worker
+# must share SESSION_SECRET; without it sessions only live in this process.
+
+ROLES = ("admin", "creator", "evaluator")
+
+SESSION_SECRET = os.environ.get("SESSION_SECRET", "")
+SESSION_TTL_HOURS = float(os.environ.get("SESSION_TTL_HOURS", "12"))
+
+_secret = SESSION_SECRET.encode() or secrets.token_bytes(32)
+
+# Revoked sessions (jti → expiry) and users (id → revocation time), kept
+# until the tokens they affect would have expired anyway
+_revoked_sessions: dict[str, float] = {}
+_revoked_users: dict[int, float] = {}
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(_secret, payload.encode(), hashlib.sha256).digest())
+
+
+def create_session(user_id: int, role: str) -> tuple[str, int]:
+    """Signed session token for a logged-in user. Returns (token, expiry timestamp)."""
+    now = int(time.time())
+    claims = {
+        "sub": user_id,
+        "role": role,
+        "iat": now,
+        "exp": now + int(SESSION_TTL_HOURS * 3600),
+        "jti": secrets.token_urlsafe(12),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}", claims["exp"]
+
+
+def read_session(token: str) -> Optional[dict]:
+    """Claims of a valid, unexpired and unrevoked token, else None."""
+    try:
+        payload, signature = token.split(".", 1)
+        if not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        claims = json.loads(_b64decode(payload))
+        if claims["exp"] <= time.time() or claims["jti"] in _revoked_sessions:
+            return None
+        if claims["iat"] <= _revoked_users.get(claims["sub"], -1):
+            return None
+    except (ValueError, KeyError, TypeError):
+        return None
+    return claims
+
+
+def _purge_revocations():
+    now = time.time()
+    for jti, exp in list(_revoked_sessions.items()):
+        if exp <= now:
+            del _revoked_sessions[jti]
+    ttl = SESSION_TTL_HOURS * 3600
+    for user_id, revoked_at in list(_revoked_users.items()):
+        if revoked_at + ttl <= now:
+            del _revoked_users[user_id]
+
+
+def revoke_session(claims: dict):
+    _purge_revocations()
+    _revoked_sessions[claims["jti"]] = claims["exp"]
+
+
+def revoke_user_sessions(user_id: int):
+    """Invalidate every session issued so far to ``user_id`` (e.g. deleted user)."""
+    _purge_revocations()
+    _revoked_users[user_id] = time.time()
+
+
+def require_role(*roles: str):
+    """Dependency accepting a Bearer session token of one of ``roles``. Returns its claims."""
+    allowed = roles or ROLES
+
+    def dependency(authorization: str = Header("")) -> dict:
+        scheme, _, token = authorization.partition(" ")
+        claims = read_session(token) if scheme.lower() == "bearer" else None
+        if claims is None:
+            raise HTTPException(
+                status_code=401,
+                detail="Sesión inválida o expirada",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        if claims["role"] not in allowed:
+            raise HTTPException(status_code=403, detail="No tiene permiso para esta acción")
+        return claims
+
+    return dependency
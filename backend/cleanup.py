@@ -0,0 +1,89 @@
+"""
+Periodic removal of expired incomplete evaluations.
+
+Deletes run in small batches, each in its own short transaction, with a
+pause in between so candidate writes are never blocked for long. Child
+rows (responses, results) are deleted explicitly: a Core bulk delete
+bypasses the ORM cascade, and existing SQLite tables have no ON DELETE
+CASCADE.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import delete, select
+
+from backend.database import SessionLocal
+from backend.models import Evaluation, EvaluationResult, Response
+
+# Incomplete evaluations older than this are auto-deleted
+EXPIRY_DAYS = int(os.environ.get("EVAL_EXPIRY_DAYS", "7"))
+CLEANUP_INTERVAL_HOURS = float(os.environ.get("EVAL_CLEANUP_INTERVAL_HOURS", "24"))
+CLEANUP_BATCH = int(os.environ.get("EVAL_CLEANUP_BATCH", "500"))
+CLEANUP_PAUSE = float(os.environ.get("EVAL_CLEANUP_PAUSE", "0.05"))  # seconds between batches
+
+# Totals since process start, plus figures of the last run
+cleanup_stats = {
+    "runs": 0,
+    "evaluations_deleted": 0,
+    "responses_deleted": 0,
+    "last_run_evaluations": 0,
+    "last_run_responses": 0,
+    "last_run_seconds": 0.0,
+}
+
+
+async def delete_expired_batch(cutoff: datetime) -> tuple[int, int]:
+    """Delete one batch of expired evaluations. Returns (evaluations, responses) removed."""
+    async with SessionLocal() as db:
+        ids = (await db.execute(
+            select(Evaluation.id)
+            .where(
+                Evaluation.status.in_(("pending", "in_progress")),
+                Evaluation.created_at < cutoff,
+            )
+            .limit(CLEANUP_BATCH)
+        )).scalars().all()
+        if not ids:
+            return 0, 0
+        responses = await db.execute(delete(Response).where(Response.evaluation_id.in_(ids)))
+        await db.execute(delete(EvaluationResult).where(EvaluationResult.evaluation_id.in_(ids)))
+        evaluations = await db.execute(delete(Evaluation).where(Evaluation.id.in_(ids)))
+        await db.commit()
+        return evaluations.rowcount, responses.rowcount
+
+
+async def delete_expired() -> tuple[int, int]:
+    """Delete every expired incomplete evaluation, batch by batch."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=EXPIRY_DAYS)
+    started = time.monotonic()
+    total_evals = total_resps = 0
+    while True:
+        evals, resps = await delete_expired_batch(cutoff)
+        total_evals += evals
+        total_resps += resps
+        if evals < CLEANUP_BATCH:
+            break
+        await asyncio.sleep(CLEANUP_PAUSE)
+
+    cleanup_stats["runs"] += 1
+    cleanup_stats["evaluations_deleted"] += total_evals
+    cleanup_stats["responses_deleted"] += total_resps
+    cleanup_stats["last_run_evaluations"] = total_evals
+    cleanup_stats["last_run_responses"] = total_resps
+    cleanup_stats["last_run_seconds"] = round(time.monotonic() - started, 3)
+    if total_evals:
+        print(f"[cleanup] Removed {total_evals} expired incomplete evaluation(s) "
+              f"and {total_resps} response(s) in {cleanup_stats['last_run_seconds']}s.")
+    return total_evals, total_resps
+
+
+async def cleanup_expired_evaluations():
+    """Delete expired incomplete evaluations every EVAL_CLEANUP_INTERVAL_HOURS."""
+    while True:
+        try:
+            await delete_expired()
+        except Exception as e:
+            print(f"[cleanup] Error: {e}")
+        await asyncio.sleep(CLEANUP_INTERVAL_HOURS * 3600)
@@ -0,0 +1,237 @@
+"""
+Spreadsheet export of evaluations with their scores (GET /api/evaluations/export).
+
+Rows are read from a server-side cursor (AsyncSession.stream) and encoded
+as they arrive into chunks of about EXPORT_CHUNK_BYTES, so memory use
+doesn't depend on how many evaluations are exported. CSV is UTF-8 with a
+BOM so Excel shows the accents; XLSX is a minimal workbook written with
+zipfile to a non-seekable sink, which streams each ZIP entry with a data
+descriptor instead of going back to patch its header.
+"""
+import csv
+import io
+import os
+import re
+import zipfile
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+from xml.sax.saxutils import escape
+
+from backend.database import SessionLocal
+from backend.models import Evaluation, EvaluationResult
+from backend.questions import AREAS, AREA_KEYS, DIMENSIONS, compute_results_packed
+
+EXPORT_BATCH = int(os.environ.get("EXPORT_BATCH", "1000"))          # rows per cursor fetch
+EXPORT_CHUNK_BYTES = int(os.environ.get("EXPORT_CHUNK_BYTES", str(64 * 1024)))
+
+STATUS_LABELS = {"pending": "Pendiente", "in_progress": "En curso", "completed": "Completada"}
+
+# (column label, key) of the evaluation fields, in sheet order; overall_pct
+# and verdict must stay adjacent (see export_row)
+FIELDS = [
+    ("ID", "id"),
+    ("Token", "token"),
+    ("Candidato", "candidate_name"),
+    ("Cédula", "candidate_id"),
+    ("Email", "candidate_email"),
+    ("Teléfono", "candidate_phone"),
+    ("Cargo", "position"),
+    ("Empresa", "company"),
+    ("Estado", "status"),
+    ("Preguntas respondidas", "answered_count"),
+    ("Creada (UTC)", "created_at"),
+    ("Completada (UTC)", "completed_at"),
+    ("Puntaje global %", "overall_pct"),
+    ("Veredicto", "verdict"),
+]
+
+HEADER = (
+    [label for label, _ in FIELDS]
+    + [f"{AREAS[a]['name']} %" for a in AREA_KEYS]
+    + [f"{AREAS[a]['name']} - {AREAS[a]['dimensions'][d]} %" for a, d in DIMENSIONS]
+)
+
+COLUMNS = [
+    Evaluation.id, Evaluation.token, Evaluation.candidate_name, Evaluation.candidate_id,
+    Evaluation.candidate_email, Evaluation.candidate_phone, Evaluation.position, Evaluation.company,
+    Evaluation.status, Evaluation.answered_count, Evaluation.created_at, Evaluation.completed_at,
+    EvaluationResult.overall_pct, EvaluationResult.verdict, EvaluationResult.areas,
+    Evaluation.answers_packed,
+]
+
+
+def _format_time(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+_STATUS = [key for _, key in FIELDS].index("status")
+_TIMES = [i for i, (_, key) in enumerate(FIELDS) if key in ("created_at", "completed_at")]
+_OVERALL = [key for _, key in FIELDS].index("overall_pct")
+
+
+def export_row(row) -> list:
+    """Sheet values of one COLUMNS row, in HEADER order."""
+    values = row._mapping
+    overall, verdict, areas = values["overall_pct"], values["verdict"], values["areas"]
+    if areas is None and values["status"] == "completed" and values["answers_packed"]:
+        # Result not materialized yet (see result_store.backfill_results)
+        calc = compute_results_packed(values["answers_packed"])
+        overall, verdict, areas = calc["overall_pct"], calc["verdict"], calc["areas"]
+
+    out = [values[key] for _, key in FIELDS]
+    out[_STATUS] = STATUS_LABELS.get(out[_STATUS], out[_STATUS])
+    for i in _TIMES:
+        out[i] = _format_time(out[i])
+    out[_OVERALL:_OVERALL + 2] = [overall, verdict]
+
+    by_key = {a["key"]: a for a in areas or []}
+    out += [by_key[a]["pct"] if a in by_key else None for a in AREA_KEYS]
+    for a, d in DIMENSIONS:
+        dim = by_key[a]["dimensions"].get(d) if a in by_key else None
+        out.append(dim["pct"] if dim else None)
+    return out
+
+
+async def stream_rows(query) -> AsyncIterator[list]:
+    """
+    Export rows of ``query`` (a select of COLUMNS) from a server-side
+    cursor. Uses its own session: the response is still being sent after
+    the endpoint (and its get_db session) returned.
+    """
+    async with SessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH))
+        async for partition in result.partitions():
+            for row in partition:
+                yield export_row(row)
+
+
+# ── CSV ──────────────────────────────────────────────────────────────────────
+
+def _csv_cell(value):
+    # Text starting like a formula would be evaluated by Excel/Sheets
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + value
+    return value
+
+
+async def csv_chunks(rows: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write("\ufeff")  # BOM
+    writer.writerow(HEADER)
+    async for row in rows:
+        writer.writerow([_csv_cell(v) for v in row])
+        if buf.tell() >= EXPORT_CHUNK_BYTES:
+            yield buf.getvalue().encode()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode()
+
+
+# ── XLSX ─────────────────────────────────────────────────────────────────────
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Evaluaciones" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+# Characters XML 1.0 doesn't allow, even escaped
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def _xlsx_row(values) -> str:
+    cells = []
+    for value in values:
+        if value is None:
+            cells.append("<c/>")
+        elif isinstance(value, (int, float)):
+            cells.append(f"<c><v>{value}</v></c>")
+        else:
+            text = escape(_XML_ILLEGAL.sub("", str(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return "<row>" + "".join(cells) + "</row>"
+
+
+class _Sink(io.RawIOBase):
+    """Write-only, non-seekable buffer that zipfile writes into and we drain."""
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        self.size = 0
+        return data
+
+
+async def xlsx_chunks(rows: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, content in _XLSX_PARTS.items():
+            zf.writestr(name, content)
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write((_SHEET_START + _xlsx_row(HEADER)).encode())
+            async for row in rows:
+                sheet.write(_xlsx_row(row).encode())
+                if sink.size >= EXPORT_CHUNK_BYTES:
+                    yield sink.drain()
+            sheet.write(_SHEET_END.encode())
+    yield sink.drain()
+
+
+FORMATS = {
+    "csv": (csv_chunks, "text/csv; charset=utf-8"),
+    "xlsx": (xlsx_chunks, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
@@ -0,0 +1,107 @@
+"""
+Single-runner coordination for background jobs.
+
+With ``uvicorn --workers N`` every worker runs the lifespan hook. Periodic
+jobs are wrapped in run_as_leader(), which holds a lease row in
+``job_leases``: only the holder runs the job, it renews the lease every
+LEASE_TTL / 3 seconds, and if it dies the lease expires and another worker
+takes over.
+"""
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from backend.database import SessionLocal
+from backend.models import JobLease
+
+LEASE_TTL = float(os.environ.get("JOB_LEASE_TTL_SECONDS", "60"))
+OWNER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+async def try_acquire(name: str) -> bool:
+    """Take or renew lease ``name``. True if this process holds it afterwards."""
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(seconds=LEASE_TTL)
+    async with SessionLocal() as db:
+        result = await db.execute(
+            update(JobLease)
+            .where(JobLease.name == name, or_(JobLease.owner == OWNER_ID, JobLease.expires_at < now))
+            .values(owner=OWNER_ID, expires_at=expires_at)
+        )
+        if result.rowcount:
+            await db.commit()
+            return True
+        db.add(JobLease(name=name, owner=OWNER_ID, expires_at=expires_at))
+        try:
+            await db.commit()
+            return True
+        except IntegrityError:
+            return False  # held by another live worker
+
+
+async def release(name: str):
+    async with SessionLocal() as db:
+        await db.execute(delete(JobLease).where(JobLease.name == name, JobLease.owner == OWNER_ID))
+        await db.commit()
+
+
+async def _holds_lease(name: str) -> bool:
+    try:
+        return await try_acquire(name)
+    except Exception as e:
+        print(f"[leader] {name}: lease error: {e}")
+        return False
+
+
+async def _stop(task: asyncio.Task):
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        print(f"[leader] job stopped with error: {e}")
+
+
+async def run_as_leader(name: str, job):
+    """
+    Run ``await job()`` only while this process holds lease ``name``.
+    Followers keep retrying so they take over when the leader goes away; a
+    leader that fails to renew stops its job. A job that raises is logged
+    and started again after LEASE_TTL / 3 seconds. The lease is released
+    when this coroutine is cancelled (on shutdown).
+    """
+    renew_every = LEASE_TTL / 3
+    task = None
+    try:
+        while True:
+            if not await _holds_lease(name):
+                await asyncio.sleep(renew_every)
+                continue
+            print(f"[leader] {name}: running in {OWNER_ID}")
+            task = asyncio.create_task(job())
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=renew_every)
+                if done:
+                    if task.cancelled() or task.exception() is None:
+                        return task.result()
+                    print(f"[leader] {name}: job failed: {task.exception()!r}, retrying")
+                    task = None
+                    await asyncio.sleep(renew_every)
+                    break
+                if not await _holds_lease(name):
+                    print(f"[leader] {name}: lease lost, stopping")
+                    await _stop(task)
+                    break
+    finally:
+        if task is not None and not task.done():
+            await _stop(task)
+        try:
+            await release(name)
+        except Exception:
+            pass  # expires on its own
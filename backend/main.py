@@ -1,22 +1,31 @@
 import os
 import asyncio
 from contextlib import asynccontextmanager
-from datetime import datetime, timezone, timedelta
-from fastapi import FastAPI, Request, HTTPException, Depends
+from fastapi import FastAPI, Request, HTTPException, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from sqlalchemy import delete, select, func
+from fastapi.responses import FileResponse, PlainTextResponse
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.database import init_db, SessionLocal, get_db
-from backend.models import Evaluation, AdminUser
-from backend.auth import hash_password, verify_password
-from backend.routers import evaluations, responses, results
+from backend.database import engine, init_db, SessionLocal, get_db
+from backend.models import AdminUser
+from backend.auth import (
+    DUMMY_HASH, ROLES, SESSION_SECRET, create_session, hash_password_async, needs_rehash,
+    require_role, revoke_session, revoke_user_sessions, verify_password_async,
+)
+from backend.result_cache import result_cache
+from backend.result_store import backfill_results
+from backend.cleanup import cleanup_expired_evaluations, cleanup_stats
+from backend.leader import run_as_leader
+from backend.metrics import MetricsMiddleware, instrument_engine, render_metrics
+from backend import profiler
+from backend.routers import evaluations, responses, results, question_bank
 
-# Incomplete evaluations older than this are auto-deleted
-EXPIRY_DAYS = int(os.environ.get("EVAL_EXPIRY_DAYS", "7"))
 ADMIN_PASS = os.environ.get("ADMIN_PASS", "evamed2024")
+# Bearer token required by /metrics when set
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
 
 
 async def seed_default_admin():
@@ -26,46 +35,44 @@ async def seed_default_admin():
         if not result.scalars().first():
             admin = AdminUser(
                 username="admin",
-                password_hash=hash_password(ADMIN_PASS),
+                password_hash=await hash_password_async(ADMIN_PASS),
                 role="admin",
                 display_name="Administrador",
             )
             db.add(admin)
-            await db.commit()
+            try:
+                await db.commit()
+            except IntegrityError:
+                return  # another worker created it first
             print("[startup] Default admin user created (username: admin)")
 
 
-async def cleanup_expired_evaluations():
-    """Delete incomplete evaluations older than EXPIRY_DAYS. Runs every 24 h."""
-    while True:
-        try:
-            cutoff = datetime.now(timezone.utc) - timedelta(days=EXPIRY_DAYS)
-            async with SessionLocal() as db:
-                result = await db.execute(
-                    delete(Evaluation).where(
-                        Evaluation.status != "completed",
-                        Evaluation.created_at < cutoff,
-                    )
-                )
-                deleted = result.rowcount
-                if deleted:
-                    print(f"[cleanup] Removed {deleted} expired incomplete evaluation(s).")
-                await db.commit()
-        except Exception as e:
-            print(f"[cleanup] Error: {e}")
-        await asyncio.sleep(86400)  # 24 hours
+async def background_jobs():
+    """Startup backfill and periodic cleanup, run by a single worker (see leader.py)."""
+    try:
+        await backfill_results()
+    except Exception as e:
+        print(f"[startup] Result backfill failed: {e}")  # retried on the next start
+    await cleanup_expired_evaluations()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    if not SESSION_SECRET:
+        print("[startup] SESSION_SECRET not set: admin sessions end on restart and only work with one worker")
     await init_db()
     await seed_default_admin()
-    task = asyncio.create_task(cleanup_expired_evaluations())
+    task = asyncio.create_task(run_as_leader("background-jobs", background_jobs))
     yield
     task.cancel()
+    try:
+        await task  # lets the leader stop its job and release the lease
+    except asyncio.CancelledError:
+        pass
 
 
 app = FastAPI(title="EvaMed API", lifespan=lifespan)
+instrument_engine(engine.sync_engine)
 
 app.add_middleware(
     CORSMiddleware,
@@ -73,10 +80,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+profiler.install_profiler(app, engine)
 
 app.include_router(evaluations.router)
 app.include_router(responses.router)
 app.include_router(results.router)
+app.include_router(question_bank.router)
 
 
 # ── Admin auth ───────────────────────────────────────────────────────────────
@@ -90,21 +100,42 @@ async def admin_auth(request: Request, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(AdminUser).where(AdminUser.username == username))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(password, user.password_hash):
+    if not user:
+        await verify_password_async(password, DUMMY_HASH)
+        return {"ok": False}
+    if not await verify_password_async(password, user.password_hash):
         return {"ok": False}
 
-    return {
+    token, expires_at = create_session(user.id, user.role)
+    session = {
         "ok": True,
         "role": user.role,
         "username": user.username,
         "display_name": user.display_name or user.username,
         "user_id": user.id,
+        "token": token,
+        "expires_at": expires_at,
     }
 
+    if needs_rehash(user.password_hash):
+        # Legacy salted SHA-256 or older KDF cost: upgrade while we have the password
+        user.password_hash = await hash_password_async(password)
+        try:
+            await db.commit()
+        except OperationalError:
+            await db.rollback()  # retried on the next login
+    return session
+
+
+@app.post("/api/admin/logout")
+async def admin_logout(session: dict = Depends(require_role())):
+    revoke_session(session)
+    return {"ok": True}
+
 
 # ── Admin user management ─────────────────────────────────────────────────────
 
-@app.get("/api/admin/users")
+@app.get("/api/admin/users", dependencies=[Depends(require_role("admin"))])
 async def list_admin_users(db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(AdminUser).order_by(AdminUser.id))
     users = result.scalars().all()
@@ -120,7 +151,7 @@ async def list_admin_users(db: AsyncSession = Depends(get_db)):
     ]
 
 
-@app.post("/api/admin/users")
+@app.post("/api/admin/users", dependencies=[Depends(require_role("admin"))])
 async def create_admin_user(request: Request, db: AsyncSession = Depends(get_db)):
     body = await request.json()
     username = body.get("username", "").strip()
@@ -130,7 +161,7 @@ async def create_admin_user(request: Request, db: AsyncSession = Depends(get_db)
 
     if not username or not password:
         raise HTTPException(status_code=400, detail="Usuario y contraseña son requeridos")
-    if role not in ("admin", "creator", "evaluator"):
+    if role not in ROLES:
         raise HTTPException(status_code=400, detail="Rol inválido")
 
     existing = await db.execute(select(AdminUser).where(AdminUser.username == username))
@@ -139,7 +170,7 @@ async def create_admin_user(request: Request, db: AsyncSession = Depends(get_db)
 
     user = AdminUser(
         username=username,
-        password_hash=hash_password(password),
+        password_hash=await hash_password_async(password),
         role=role,
         display_name=display_name or username,
     )
@@ -149,7 +180,7 @@ async def create_admin_user(request: Request, db: AsyncSession = Depends(get_db)
     return {"id": user.id, "username": user.username, "role": user.role, "display_name": user.display_name}
 
 
-@app.delete("/api/admin/users/{user_id}")
+@app.delete("/api/admin/users/{user_id}", dependencies=[Depends(require_role("admin"))])
 async def delete_admin_user(user_id: int, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(AdminUser).where(AdminUser.id == user_id))
     user = result.scalar_one_or_none()
@@ -166,9 +197,40 @@ async def delete_admin_user(user_id: int, db: AsyncSession = Depends(get_db)):
 
     await db.delete(user)
     await db.commit()
+    revoke_user_sessions(user_id)
     return {"ok": True}
 
 
+# ── Runtime stats ─────────────────────────────────────────────────────────────
+
+@app.get("/api/admin/stats", dependencies=[Depends(require_role("admin"))])
+async def admin_stats():
+    """Counters of this worker process."""
+    return {"result_cache": result_cache.stats(), "cleanup": cleanup_stats}
+
+
+@app.get("/api/admin/sql-profile", dependencies=[Depends(require_role("admin"))])
+async def sql_profile(limit: int = Query(50, ge=1, le=1000), flagged: bool = False):
+    """Latest per-request SQL summaries (SQL_PROFILE=1), newest first. ``flagged``: only slow or N+1."""
+    items = list(profiler.profiles)
+    if flagged:
+        items = [p for p in items if p["slow_queries"] or p["repeated"]]
+    return {
+        "enabled": profiler.SQL_PROFILE,
+        "slow_ms": profiler.SQL_SLOW_MS,
+        "repeat_threshold": profiler.SQL_REPEAT_THRESHOLD,
+        "requests": items[::-1][:limit],
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="No autorizado")
+    body = render_metrics({"result_cache": result_cache.stats(), "cleanup": cleanup_stats})
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
 # Serve React build in production
 STATIC_DIR = os.path.join(os.path.dirname(__file__), "..", "frontend", "dist")
 if os.path.isdir(STATIC_DIR):
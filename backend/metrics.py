@@ -0,0 +1,171 @@
+"""
+Request and database metrics in Prometheus text format (GET /metrics).
+
+MetricsMiddleware is a plain ASGI middleware recording, per route template
+(``/api/eval/{token}/response``, not the concrete URL), a latency
+histogram, response status counts and the number and time of SQL
+statements run while handling the request; plus the number of requests in
+flight. Statements are counted through engine events and attributed to
+the current request with a context variable. Values are per worker
+process.
+"""
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+# Latency histogram bucket bounds in seconds (Prometheus client defaults)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+UNMATCHED = "<unmatched>"
+BACKGROUND = "<background>"  # statements run outside any request
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot: above the largest bound
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+
+
+class _QueryStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+_latency: dict[tuple[str, str], _Histogram] = defaultdict(_Histogram)
+_responses: dict[tuple[str, str, int], int] = defaultdict(int)
+_queries: dict[tuple[str, str], _QueryStats] = defaultdict(_QueryStats)
+_in_flight = [0]
+
+# Statements of the request being handled in the current task
+_request_queries: ContextVar[Optional[_QueryStats]] = ContextVar("request_queries", default=None)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        queries = _QueryStats()
+        token = _request_queries.set(queries)
+        _in_flight[0] += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _in_flight[0] -= 1
+            _request_queries.reset(token)
+            # FastAPI stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", UNMATCHED)
+            method = scope["method"]
+            _latency[(method, route)].observe(elapsed)
+            _responses[(method, route, status)] += 1
+            if queries.count:
+                totals = _queries[(method, route)]
+                totals.count += queries.count
+                totals.seconds += queries.seconds
+
+
+def instrument_engine(sync_engine):
+    """Count and time every statement executed through ``sync_engine``."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        stats = _request_queries.get() or _queries[("", BACKGROUND)]
+        stats.count += 1
+        stats.seconds += elapsed
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        started = exception_context.connection and exception_context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+
+def _labels(**labels) -> str:
+    def escape(value) -> str:
+        return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def render_metrics(gauges: dict[str, dict]) -> str:
+    """
+    Prometheus text exposition of the collected metrics. ``gauges`` adds
+    plain numeric stats, e.g. {"result_cache": {"hits": 3}} becomes
+    ``evamed_result_cache_hits 3``.
+    """
+    lines = [
+        "# HELP evamed_http_request_duration_seconds Request latency by route.",
+        "# TYPE evamed_http_request_duration_seconds histogram",
+    ]
+    for (method, route), hist in sorted(_latency.items()):
+        cumulative = 0
+        for bound, count in zip((*BUCKETS, "+Inf"), hist.counts):
+            cumulative += count
+            labels = _labels(method=method, route=route, le=bound)
+            lines.append(f"evamed_http_request_duration_seconds_bucket{labels} {cumulative}")
+        labels = _labels(method=method, route=route)
+        lines.append(f"evamed_http_request_duration_seconds_sum{labels} {hist.sum}")
+        lines.append(f"evamed_http_request_duration_seconds_count{labels} {cumulative}")
+
+    lines += [
+        "# HELP evamed_http_responses_total Responses by route and status code.",
+        "# TYPE evamed_http_responses_total counter",
+    ]
+    for (method, route, status), count in sorted(_responses.items()):
+        lines.append(f"evamed_http_responses_total{_labels(method=method, route=route, status=status)} {count}")
+
+    lines += [
+        "# HELP evamed_http_requests_in_flight Requests being handled.",
+        "# TYPE evamed_http_requests_in_flight gauge",
+        f"evamed_http_requests_in_flight {_in_flight[0]}",
+        "# HELP evamed_db_queries_total SQL statements executed, by route.",
+        "# TYPE evamed_db_queries_total counter",
+    ]
+    queries = sorted(_queries.items())
+    for (method, route), stats in queries:
+        lines.append(f"evamed_db_queries_total{_labels(method=method, route=route)} {stats.count}")
+    lines += [
+        "# HELP evamed_db_query_seconds_total Time spent in SQL statements, by route.",
+        "# TYPE evamed_db_query_seconds_total counter",
+    ]
+    for (method, route), stats in queries:
+        lines.append(f"evamed_db_query_seconds_total{_labels(method=method, route=route)} {stats.seconds}")
+
+    for group, values in gauges.items():
+        for name, value in values.items():
+            if isinstance(value, (int, float)):
+                metric = f"evamed_{group}_{name}"
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,178 @@
+"""
+Versioned schema migrations.
+
+    python -m backend.migrations [--status]
+
+``schema_version`` holds the number of steps of MIGRATIONS applied to the
+database. On startup migrate() reads it with a single query and returns
+if the schema is current; otherwise it runs only the pending steps, in
+order and in one transaction, and records the new version. Databases
+created before this table existed start at 0, so every step must also
+work on a schema that already has (part of) its changes.
+
+Workers starting at once serialize on a lock taken before any DDL (an
+advisory lock on PostgreSQL, the write lock on SQLite); the others wait
+up to MIGRATE_LOCK_TIMEOUT_SECONDS and then find the schema current.
+
+New tables, columns and indexes are added as new steps at the end of
+MIGRATIONS; never reorder or remove steps.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+
+from backend.database import Base, engine, is_busy_error
+from backend.models import Evaluation
+
+# Seconds a worker waits for another worker's migration before failing
+MIGRATE_LOCK_TIMEOUT = float(os.environ.get("MIGRATE_LOCK_TIMEOUT_SECONDS", "600"))
+
+
+def _create_tables(sync_conn):
+    # Also creates the indexes of tables that don't exist yet
+    Base.metadata.create_all(sync_conn)
+
+
+# Columns added to evaluations after its first release, with extra DDL.
+# candidate_id, answered_mask and answers_packed stay NULL on older rows.
+_ADDED_COLUMNS = {
+    "candidate_id": "",
+    "answered_count": " NOT NULL DEFAULT 0",
+    "answered_mask": "",
+    "answers_packed": "",
+}
+
+
+def _add_evaluation_columns(sync_conn):
+    existing = {col["name"] for col in inspect(sync_conn).get_columns("evaluations")}
+    for name, extra in _ADDED_COLUMNS.items():
+        if name in existing:
+            continue
+        col_type = Evaluation.__table__.c[name].type.compile(dialect=sync_conn.dialect)
+        sync_conn.execute(text(f"ALTER TABLE evaluations ADD COLUMN {name} {col_type}{extra}"))
+        if name == "answered_count":
+            sync_conn.execute(text(
+                "UPDATE evaluations SET answered_count = ("
+                "SELECT COUNT(DISTINCT question_id) FROM responses "
+                "WHERE responses.evaluation_id = evaluations.id)"
+            ))
+
+
+def _dedupe_responses(sync_conn):
+    # Duplicate answers must go before the unique (evaluation_id, question_id) index
+    indexes = {ix["name"] for ix in inspect(sync_conn).get_indexes("responses")}
+    if "uq_responses_evaluation_question" in indexes:
+        return
+    # Keep the most recent answer of each question
+    result = sync_conn.execute(text(
+        "DELETE FROM responses WHERE id NOT IN ("
+        "SELECT MAX(id) FROM responses GROUP BY evaluation_id, question_id)"
+    ))
+    if result.rowcount:
+        print(f"[migrate] Removed {result.rowcount} duplicate response(s).")
+
+
+def _create_missing_indexes(sync_conn):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
+def _delete_orphaned_responses(sync_conn):
+    # Left behind by the cleanup job before it deleted child rows
+    result = sync_conn.execute(text(
+        "DELETE FROM responses WHERE NOT EXISTS ("
+        "SELECT 1 FROM evaluations WHERE evaluations.id = responses.evaluation_id)"
+    ))
+    if result.rowcount:
+        print(f"[migrate] Removed {result.rowcount} orphaned response(s).")
+
+
+MIGRATIONS = [
+    ("create tables", _create_tables),
+    ("evaluation progress and packed answer columns", _add_evaluation_columns),
+    ("deduplicate responses", _dedupe_responses),
+    ("create missing indexes", _create_missing_indexes),
+    ("delete orphaned responses", _delete_orphaned_responses),
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+async def current_version(conn) -> int:
+    try:
+        return (await conn.execute(text("SELECT version FROM schema_version"))).scalar() or 0
+    except DBAPIError:
+        return 0  # no schema_version table yet
+
+
+async def _lock(conn):
+    """Serialize concurrent migrate() calls until ``conn`` commits."""
+    if conn.dialect.name == "postgresql":
+        await conn.execute(text("SELECT pg_advisory_xact_lock(3812001)"))  # waits for the holder
+    elif conn.dialect.name == "sqlite":
+        # The driver doesn't start a transaction for DDL; take the write lock
+        # up front. Waits busy_timeout, then migrate() retries.
+        await conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+async def _migrate_locked() -> int:
+    async with engine.connect() as conn:
+        await _lock(conn)
+        await conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+        version = await current_version(conn)  # another worker may have migrated meanwhile
+        for number, (name, step) in enumerate(MIGRATIONS[version:], start=version + 1):
+            await conn.run_sync(step)
+            print(f"[migrate] {number}/{SCHEMA_VERSION} {name}")
+        if version < SCHEMA_VERSION:
+            await conn.execute(text("DELETE FROM schema_version"))
+            await conn.execute(
+                text("INSERT INTO schema_version (version) VALUES (:v)"), {"v": SCHEMA_VERSION}
+            )
+        await conn.commit()
+    return max(SCHEMA_VERSION - version, 0)
+
+
+async def migrate() -> int:
+    """Apply pending migrations. Returns how many steps ran."""
+    async with engine.connect() as conn:
+        if await current_version(conn) >= SCHEMA_VERSION:
+            return 0
+
+    deadline = time.monotonic() + MIGRATE_LOCK_TIMEOUT
+    waiting = False
+    while True:
+        try:
+            return await _migrate_locked()
+        except DBAPIError as e:
+            if not is_busy_error(e) or time.monotonic() >= deadline:
+                raise
+            if not waiting:
+                print("[migrate] waiting for another worker's migration...")
+                waiting = True
+            await asyncio.sleep(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument("--status", action="store_true", help="only show the schema version")
+    args = parser.parse_args()
+
+    async def run():
+        if args.status:
+            async with engine.connect() as conn:
+                version = await current_version(conn)
+            print(f"[migrate] schema version {version} of {SCHEMA_VERSION}")
+        else:
+            applied = await migrate()
+            print(f"[migrate] {applied} step(s) applied, schema version {SCHEMA_VERSION}")
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, JSON, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from backend.database import Base
@@ -12,7 +12,7 @@ class AdminUser(Base):
     password_hash = Column(String, nullable=False)
     role = Column(String, nullable=False, default="creator")  # "admin" | "creator"
     display_name = Column(String, nullable=True)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
 
 class Evaluation(Base):
@@ -29,10 +29,25 @@ class Evaluation(Base):
     # pending | in_progress | completed
     status = Column(String, default="pending")
     current_question = Column(Integer, default=0)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    completed_at = Column(DateTime, nullable=True)
+    answered_count = Column(Integer, nullable=False, default=0)  # distinct questions answered
+    answered_mask = Column(LargeBinary, nullable=True)            # bit i ⇔ QUESTIONS[i] answered
+    answers_packed = Column(LargeBinary, nullable=True)           # 2 bits per question, see questions.py
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    completed_at = Column(DateTime(timezone=True), nullable=True)
 
     responses = relationship("Response", back_populates="evaluation", cascade="all, delete-orphan")
+    result = relationship(
+        "EvaluationResult", back_populates="evaluation", uselist=False, cascade="all, delete-orphan"
+    )
+
+    # Keyset pagination / filters of the admin list (ORDER BY <col>, id)
+    __table_args__ = (
+        Index("ix_evaluations_created_at_id", "created_at", "id"),
+        Index("ix_evaluations_candidate_name_id", "candidate_name", "id"),
+        Index("ix_evaluations_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_evaluations_company_created_at_id", "company", "created_at", "id"),
+        Index("ix_evaluations_position_created_at_id", "position", "created_at", "id"),
+    )
 
 
 class Response(Base):
@@ -42,6 +57,35 @@ class Response(Base):
     evaluation_id = Column(Integer, ForeignKey("evaluations.id"), nullable=False)
     question_id = Column(Integer, nullable=False)
     answer_value = Column(Integer, nullable=False)  # 0 | 1 | 2
-    answered_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    answered_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     evaluation = relationship("Evaluation", back_populates="responses")
+
+    # One answer per question; target of the upsert in save_response
+    __table_args__ = (
+        Index("uq_responses_evaluation_question", "evaluation_id", "question_id", unique=True),
+    )
+
+
+class EvaluationResult(Base):
+    """Scores materialized once when an evaluation is completed."""
+    __tablename__ = "evaluation_results"
+
+    evaluation_id = Column(Integer, ForeignKey("evaluations.id"), primary_key=True)
+    overall_pct = Column(Float, nullable=False)
+    verdict = Column(String, nullable=False, index=True)  # APTO | CONDICIONALMENTE APTO | NO APTO
+    verdict_color = Column(String, nullable=False)        # green | yellow | red
+    areas = Column(JSON, nullable=False)                  # [{name, key, pct, dimensions: {key: {name, pct}}}]
+    answered_questions = Column(Integer, nullable=False)
+    computed_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    evaluation = relationship("Evaluation", back_populates="result")
+
+
+class JobLease(Base):
+    """Lease that lets a single worker process run a background job."""
+    __tablename__ = "job_leases"
+
+    name = Column(String, primary_key=True)
+    owner = Column(String, nullable=False)       # host:pid:nonce of the holder
+    expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,136 @@
+"""
+Convert per-answer ``responses`` rows into packed answer vectors.
+
+    python -m backend.pack_answers [--chunk 1000] [--delete-rows]
+
+Every evaluation that has responses but no ``answers_packed`` gets its
+packed vector, bitmap and answered count filled in. With --delete-rows the
+``responses`` rows of packed evaluations are removed afterwards; do that
+only once the app runs with ANSWER_STORAGE=packed.
+
+It can run while the app takes answers: a vector is only written while
+``answers_packed`` is still NULL, so one the app packed meanwhile (with
+the answer that came in) is kept, and the app's own compare-and-swap
+retries on top of vectors written here.
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import bindparam, select, func, update, delete
+
+from backend.database import SessionLocal, init_db
+from backend.models import Evaluation, Response
+from backend.questions import mask_from_packed, pack_answers, pack_mask
+from backend.result_store import load_answer_vectors
+
+DEFAULT_CHUNK = 1000
+
+
+async def count_responses() -> int:
+    async with SessionLocal() as db:
+        return (await db.execute(select(func.count()).select_from(Response))).scalar()
+
+
+async def pack_all(chunk_size: int = DEFAULT_CHUNK) -> int:
+    """
+    Pack every evaluation still stored only as rows. Returns how many were
+    packed here; those the app packed first are reported as skipped.
+    """
+    packed_total = skipped_total = 0
+    last_id = 0
+    while True:
+        async with SessionLocal() as db:
+            ids = (await db.execute(
+                select(Evaluation.id)
+                .where(
+                    Evaluation.answers_packed.is_(None),
+                    Evaluation.status != "pending",
+                    Evaluation.id > last_id,
+                )
+                .order_by(Evaluation.id)
+                .limit(chunk_size)
+            )).scalars().all()
+            if not ids:
+                break
+            last_id = ids[-1]
+
+            vectors, answered = await load_answer_vectors(db, ids)
+            updates = []
+            for ev_id in ids:
+                packed = pack_answers(vectors[ev_id])
+                mask = mask_from_packed(packed)
+                updates.append({
+                    "ev_id": ev_id,
+                    "packed": packed,
+                    "mask": pack_mask(mask),
+                    "count": mask.bit_count(),
+                })
+            table = Evaluation.__table__
+            result = await db.execute(
+                update(table)
+                .where(table.c.id == bindparam("ev_id"), table.c.answers_packed.is_(None))
+                .values(
+                    answers_packed=bindparam("packed"),
+                    answered_mask=bindparam("mask"),
+                    answered_count=bindparam("count"),
+                ),
+                updates,
+            )
+            packed = result.rowcount
+            if packed < 0:
+                # Not every driver reports the rowcount of an executemany
+                # (asyncpg doesn't): count the rows that now hold our vector
+                stored = dict((await db.execute(
+                    select(Evaluation.id, Evaluation.answers_packed).where(Evaluation.id.in_(ids))
+                )).all())
+                packed = sum(stored.get(u["ev_id"]) == u["packed"] for u in updates)
+            await db.commit()
+        packed_total += packed
+        skipped_total += len(ids) - packed
+        note = f", {skipped_total} skipped (packed by the app meanwhile)" if skipped_total else ""
+        print(f"[pack] {packed_total} evaluation(s) packed{note}")
+    return packed_total
+
+
+async def delete_packed_rows(chunk_size: int = DEFAULT_CHUNK) -> int:
+    """Delete responses of evaluations that already have a packed vector."""
+    deleted = 0
+    last_id = 0
+    while True:
+        async with SessionLocal() as db:
+            ids = (await db.execute(
+                select(Evaluation.id)
+                .where(Evaluation.answers_packed.is_not(None), Evaluation.id > last_id)
+                .order_by(Evaluation.id)
+                .limit(chunk_size)
+            )).scalars().all()
+            if not ids:
+                break
+            last_id = ids[-1]
+            result = await db.execute(delete(Response).where(Response.evaluation_id.in_(ids)))
+            await db.commit()
+        deleted += result.rowcount
+    return deleted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack responses rows into answer vectors.")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="evaluations per transaction")
+    parser.add_argument("--delete-rows", action="store_true", help="remove responses rows once packed")
+    args = parser.parse_args()
+
+    async def run():
+        await init_db()
+        before = await count_responses()
+        await pack_all(args.chunk)
+        if args.delete_rows:
+            deleted = await delete_packed_rows(args.chunk)
+            print(f"[pack] Deleted {deleted} of {before} responses row(s).")
+        else:
+            print(f"[pack] {before} responses row(s) kept (use --delete-rows to remove them).")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Opt-in SQL profiler (SQL_PROFILE=1).
+
+For every request it records the SQL statements run while handling it:
+
+- statements slower than SQL_SLOW_MS are logged with their parameters and
+  the route that ran them;
+- a statement run more than SQL_REPEAT_THRESHOLD times in one request
+  (after normalizing literals and IN lists) is flagged as a likely N+1
+  pattern;
+- a per-request summary goes to a ring buffer of the last
+  SQL_PROFILE_BUFFER requests, served by GET /api/admin/sql-profile.
+
+When disabled neither the middleware nor the engine listeners are
+installed, so there is no overhead at all.
+"""
+import os
+import re
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import event
+
+SQL_PROFILE = os.environ.get("SQL_PROFILE", "0") == "1"
+SQL_SLOW_MS = float(os.environ.get("SQL_SLOW_MS", "100"))
+SQL_REPEAT_THRESHOLD = int(os.environ.get("SQL_REPEAT_THRESHOLD", "5"))
+SQL_PROFILE_BUFFER = int(os.environ.get("SQL_PROFILE_BUFFER", "200"))
+
+profiles: deque = deque(maxlen=SQL_PROFILE_BUFFER)
+
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s")
+_NUMBER = re.compile(r"\b\d+\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    """Statement shape with literals, placeholders and IN lists collapsed."""
+    statement = _STRING.sub("?", statement)
+    statement = _PLACEHOLDER.sub("?", statement)
+    statement = _IN_LIST.sub("(?)", statement)
+    statement = _NUMBER.sub("?", statement)
+    return _SPACE.sub(" ", statement).strip()
+
+
+class _RequestProfile:
+    __slots__ = ("scope", "statements", "count", "seconds", "slow")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.statements: Counter = Counter()
+        self.count = 0
+        self.seconds = 0.0
+        self.slow = 0
+
+    @property
+    def route(self) -> str:
+        route = getattr(self.scope.get("route"), "path", None)
+        return f"{self.scope['method']} {route or self.scope['path']}"
+
+
+_current: ContextVar[Optional[_RequestProfile]] = ContextVar("sql_profile", default=None)
+
+
+class ProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        profile = _RequestProfile(scope)
+        token = _current.set(profile)
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current.reset(token)
+            _record(profile, status, started_at, time.perf_counter() - started)
+
+
+def _record(profile: _RequestProfile, status: int, started_at: datetime, elapsed: float):
+    repeated = [
+        {"statement": statement, "count": count}
+        for statement, count in profile.statements.most_common()
+        if count > SQL_REPEAT_THRESHOLD
+    ]
+    for item in repeated:
+        print(f"[sql] N+1? {profile.route} ran {item['count']}x: {item['statement'][:200]}")
+    profiles.append({
+        "route": profile.route,
+        "path": profile.scope["path"],
+        "status": status,
+        "started_at": started_at.isoformat(),
+        "duration_ms": round(elapsed * 1000, 2),
+        "queries": profile.count,
+        "query_ms": round(profile.seconds * 1000, 2),
+        "distinct_queries": len(profile.statements),
+        "slow_queries": profile.slow,
+        "repeated": repeated,
+    })
+
+
+def _before(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["profile_started"].pop()
+    profile = _current.get()
+    if profile is not None:
+        profile.count += 1
+        profile.seconds += elapsed
+        profile.statements[normalize(statement)] += 1
+    if elapsed * 1000 >= SQL_SLOW_MS:
+        if profile is not None:
+            profile.slow += 1
+        route = profile.route if profile is not None else "<background>"
+        params = repr(parameters)
+        if len(params) > 300:
+            params = params[:300] + "..."
+        print(f"[sql] slow {elapsed * 1000:.1f}ms {route}: {_SPACE.sub(' ', statement)[:500]} params={params}")
+
+
+def _error(exception_context):
+    conn = exception_context.connection
+    started = conn.info.get("profile_started") if conn is not None else None
+    if started:
+        started.pop()
+
+
+def install_profiler(app, engine):
+    """Install the middleware and engine listeners when SQL_PROFILE=1."""
+    if not SQL_PROFILE:
+        return
+    app.add_middleware(ProfilerMiddleware)
+    event.listen(engine.sync_engine, "before_cursor_execute", _before)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after)
+    event.listen(engine.sync_engine, "handle_error", _error)
+    print(f"[startup] SQL profiler on: slow>={SQL_SLOW_MS}ms repeat>{SQL_REPEAT_THRESHOLD} "
+          f"buffer={SQL_PROFILE_BUFFER}")
@@ -607,77 +607,191 @@ def get_next_unanswered(answered_ids: set[int]) -> dict | None:
     return None
 
 
-def compute_results(responses: list[dict]) -> dict:
-    """
-    responses: list of {"question_id": int, "answer_value": int}
-    Returns full result dict compatible with ResultOut schema.
-    """
-    answered = {r["question_id"]: r["answer_value"] for r in responses}
-
-    area_results = {}
-    for area_key, area_meta in AREAS.items():
-        dim_scores = {}  # dimension_key → {"score": float, "max": float, "name": str}
-
-        for q in QUESTIONS:
-            if q["area"] != area_key:
-                continue
-            val = answered.get(q["id"])
-            if val is None:
-                continue
-            dim = q["dimension"]
-            pts = q["scores"][val] * q["weight"]
-            max_pts = max(q["scores"]) * q["weight"]
-            if dim not in dim_scores:
-                dim_scores[dim] = {"score": 0.0, "max": 0.0, "name": area_meta["dimensions"][dim]}
-            dim_scores[dim]["score"] += pts
-            dim_scores[dim]["max"] += max_pts
-
-        # Calculate dimension percentages
-        dim_pcts = {}
-        for dk, dv in dim_scores.items():
-            pct = round((dv["score"] / dv["max"] * 100) if dv["max"] > 0 else 0, 1)
-            dim_pcts[dk] = {"name": dv["name"], "pct": pct}
+# ── Compiled scoring tables ──────────────────────────────────────────────────
+# Built once at import. Questions are addressed by their position in QUESTIONS
+# and dimensions by their position in DIMENSIONS, so scoring an answer vector
+# is plain list indexing instead of scanning QUESTIONS once per area.
+
+UNANSWERED = -1
+
+QUESTION_INDEX = {q["id"]: i for i, q in enumerate(QUESTIONS)}
+
+AREA_KEYS = list(AREAS)
+AREA_WEIGHTS = [AREAS[a]["weight"] for a in AREA_KEYS]
+
+# (area_key, dimension_key) in order of first appearance in QUESTIONS
+DIMENSIONS = list(dict.fromkeys((q["area"], q["dimension"]) for q in QUESTIONS))
+_DIM_INDEX = {d: i for i, d in enumerate(DIMENSIONS)}
+DIM_AREA = [AREA_KEYS.index(a) for a, _ in DIMENSIONS]
+DIM_NAMES = [AREAS[a]["dimensions"][d] for a, d in DIMENSIONS]
+
+# Per question: dimension index, points for answer 0/1/2 (already weighted,
+# so reversed items are just a reversed table) and maximum points.
+Q_DIM = [_DIM_INDEX[(q["area"], q["dimension"])] for q in QUESTIONS]
+Q_POINTS = [tuple(s * q["weight"] for s in q["scores"]) for q in QUESTIONS]
+Q_MAX = [max(q["scores"]) * q["weight"] for q in QUESTIONS]
+
+
+def answers_to_vector(responses: list[dict]) -> list[int]:
+    """{"question_id", "answer_value"} rows → answer vector indexed like QUESTIONS."""
+    vector = [UNANSWERED] * TOTAL_QUESTIONS
+    for r in responses:
+        i = QUESTION_INDEX.get(r["question_id"])
+        if i is not None:
+            vector[i] = r["answer_value"]
+    return vector
+
+
+def get_verdict(overall: float, area_pcts: list[float]) -> tuple[str, str]:
+    """Returns (verdict, verdict_color) for an overall score and its area scores."""
+    any_area_below_40 = any(pct < 40 for pct in area_pcts)
 
+    if overall >= 70 and not any_area_below_40:
+        return "APTO", "green"
+    if overall >= 50 and not (any_area_below_40 and overall < 60):
+        return "CONDICIONALMENTE APTO", "yellow"
+    return "NO APTO", "red"
+
+
+def score_vector(vector: list[int]) -> dict:
+    """Score one answer vector (see answers_to_vector). Same output as compute_results."""
+    n_dims = len(DIMENSIONS)
+    score = [0.0] * n_dims
+    max_pts = [0.0] * n_dims
+    first_seen = [TOTAL_QUESTIONS] * n_dims  # output order follows the first answered question
+
+    for i, val in enumerate(vector):
+        if val == UNANSWERED:
+            continue
+        d = Q_DIM[i]
+        score[d] += Q_POINTS[i][val]
+        max_pts[d] += Q_MAX[i]
+        if first_seen[d] == TOTAL_QUESTIONS:
+            first_seen[d] = i
+
+    area_dims = [[] for _ in AREA_KEYS]
+    for d in sorted(range(n_dims), key=first_seen.__getitem__):
+        if first_seen[d] == TOTAL_QUESTIONS:
+            continue
+        pct = round((score[d] / max_pts[d] * 100) if max_pts[d] > 0 else 0, 1)
+        area_dims[DIM_AREA[d]].append((DIMENSIONS[d][1], {"name": DIM_NAMES[d], "pct": pct}))
+
+    areas = []
+    for a, area_key in enumerate(AREA_KEYS):
+        dim_pcts = dict(area_dims[a])
         # Area overall = average of its dimension percentages
         area_pct = round(sum(d["pct"] for d in dim_pcts.values()) / len(dim_pcts), 1) if dim_pcts else 0.0
-
-        area_results[area_key] = {
-            "name": area_meta["name"],
+        areas.append({
+            "name": AREAS[area_key]["name"],
             "key": area_key,
             "pct": area_pct,
             "dimensions": dim_pcts,
-            "weight": area_meta["weight"],
-        }
+        })
 
     # Overall = weighted sum of area percentages
-    overall = round(
-        sum(a["pct"] * a["weight"] for a in area_results.values()), 1
-    )
-
-    # Verdict logic
-    any_area_below_40 = any(a["pct"] < 40 for a in area_results.values())
-
-    if overall >= 70 and not any_area_below_40:
-        verdict = "APTO"
-        verdict_color = "green"
-    elif overall >= 50 and not (any_area_below_40 and overall < 60):
-        verdict = "CONDICIONALMENTE APTO"
-        verdict_color = "yellow"
-    else:
-        verdict = "NO APTO"
-        verdict_color = "red"
+    overall = round(sum(a["pct"] * w for a, w in zip(areas, AREA_WEIGHTS)), 1)
+    verdict, verdict_color = get_verdict(overall, [a["pct"] for a in areas])
 
     return {
         "overall_pct": overall,
         "verdict": verdict,
         "verdict_color": verdict_color,
-        "areas": [
-            {
-                "name": v["name"],
-                "key": k,
-                "pct": v["pct"],
-                "dimensions": v["dimensions"],
-            }
-            for k, v in area_results.items()
-        ],
+        "areas": areas,
     }
+
+
+# ── Answered-question bitmap ─────────────────────────────────────────────────
+# Bit i set ⇔ QUESTIONS[i] answered. Stored little-endian in Evaluation.answered_mask.
+
+MASK_BYTES = (TOTAL_QUESTIONS + 7) // 8
+
+
+def pack_mask(mask: int) -> bytes:
+    return mask.to_bytes(MASK_BYTES, "little")
+
+
+def unpack_mask(data: bytes | None) -> int:
+    return int.from_bytes(data, "little") if data else 0
+
+
+def mask_from_ids(answered_ids) -> int:
+    mask = 0
+    for qid in answered_ids:
+        i = QUESTION_INDEX.get(qid)
+        if i is not None:
+            mask |= 1 << i
+    return mask
+
+
+def next_unanswered_from_mask(mask: int) -> dict | None:
+    """Same as get_next_unanswered, using the lowest clear bit of ``mask``."""
+    i = (~mask & (mask + 1)).bit_length() - 1
+    return QUESTIONS[i] if i < TOTAL_QUESTIONS else None
+
+
+def unanswered_from_mask(mask: int, limit: int) -> list[dict]:
+    """The first ``limit`` unanswered questions, in QUESTIONS order."""
+    upcoming = []
+    while len(upcoming) < limit:
+        q = next_unanswered_from_mask(mask)
+        if q is None:
+            break
+        upcoming.append(q)
+        mask |= 1 << QUESTION_INDEX[q["id"]]
+    return upcoming
+
+
+# ── Packed answer vectors ────────────────────────────────────────────────────
+# 2 bits per QUESTIONS position (4 per byte): 0 = unanswered, answer_value + 1
+# otherwise. Stored in Evaluation.answers_packed.
+
+PACKED_BYTES = (2 * TOTAL_QUESTIONS + 7) // 8
+
+
+def pack_answers(vector: list[int]) -> bytes:
+    data = bytearray(PACKED_BYTES)
+    for i, val in enumerate(vector):
+        if val != UNANSWERED:
+            data[i >> 2] |= (val + 1) << ((i & 3) * 2)
+    return bytes(data)
+
+
+def unpack_answers(data: bytes | None) -> list[int]:
+    """Packed blob → answer vector (UNANSWERED where no answer)."""
+    if not data:
+        return [UNANSWERED] * TOTAL_QUESTIONS
+    return [((data[i >> 2] >> ((i & 3) * 2)) & 3) - 1 for i in range(TOTAL_QUESTIONS)]
+
+
+def set_packed_answer(data: bytes | None, index: int, value: int) -> bytes:
+    """Returns a copy of ``data`` with QUESTIONS[index] answered with ``value``."""
+    buf = bytearray(data or bytes(PACKED_BYTES))
+    shift = (index & 3) * 2
+    buf[index >> 2] = (buf[index >> 2] & ~(3 << shift)) | ((value + 1) << shift)
+    return bytes(buf)
+
+
+def mask_from_packed(data: bytes | None) -> int:
+    mask = 0
+    for i, val in enumerate(unpack_answers(data)):
+        if val != UNANSWERED:
+            mask |= 1 << i
+    return mask
+
+
+def compute_results_packed(data: bytes) -> dict:
+    """compute_results for a packed answer blob."""
+    return score_vector(unpack_answers(data))
+
+
+def compute_results_batch(vectors) -> list[dict]:
+    """Score many answer vectors (e.g. rows of an evaluations × questions matrix) in one call."""
+    return [score_vector(v) for v in vectors]
+
+
+def compute_results(responses: list[dict]) -> dict:
+    """
+    responses: list of {"question_id": int, "answer_value": int}
+    Returns full result dict compatible with ResultOut schema.
+    """
+    return score_vector(answers_to_vector(responses))
@@ -0,0 +1,129 @@
+"""
+Bulk rescoring of completed evaluations.
+
+Run after changing area weights in AREAS or the verdict cutoffs in
+get_verdict, so stored results match the current scoring rules:
+
+    python -m backend.rescore [--chunk 1000] [--workers 4] [--dry-run]
+
+Completed evaluations are streamed by id in chunks, scored in a process
+pool and written back one transaction per chunk, so memory use depends on
+the chunk size only.
+"""
+import argparse
+import asyncio
+import os
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import select, func, update, insert
+
+from backend.database import SessionLocal, init_db
+from backend.models import Evaluation, EvaluationResult
+from backend.questions import compute_results_batch
+from backend.result_store import load_answer_vectors
+
+DEFAULT_CHUNK = 1000
+
+
+async def rescore_all(chunk_size: int = DEFAULT_CHUNK, workers: int | None = None,
+                      dry_run: bool = False) -> Counter:
+    """
+    Rescore every completed evaluation. Returns a Counter of verdict
+    transitions, e.g. {("APTO", "CONDICIONALMENTE APTO"): 12, ...}; unchanged
+    verdicts are counted as (verdict, verdict).
+    """
+    workers = workers or os.cpu_count() or 1
+    loop = asyncio.get_running_loop()
+    transitions = Counter()
+    done = 0
+    last_id = 0
+    started = time.monotonic()
+
+    async with SessionLocal() as db:
+        total = (await db.execute(
+            select(func.count()).select_from(Evaluation).where(Evaluation.status == "completed")
+        )).scalar()
+    print(f"[rescore] {total} completed evaluation(s), chunk={chunk_size}, workers={workers}"
+          f"{' (dry run)' if dry_run else ''}")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            async with SessionLocal() as db:
+                ids = (await db.execute(
+                    select(Evaluation.id)
+                    .where(Evaluation.status == "completed", Evaluation.id > last_id)
+                    .order_by(Evaluation.id)
+                    .limit(chunk_size)
+                )).scalars().all()
+                if not ids:
+                    break
+                last_id = ids[-1]
+
+                vectors, answered = await load_answer_vectors(db, ids)
+                old = dict((await db.execute(
+                    select(EvaluationResult.evaluation_id, EvaluationResult.verdict)
+                    .where(EvaluationResult.evaluation_id.in_(ids))
+                )).all())
+
+                # Split the chunk evenly across the pool
+                step = -(-len(ids) // workers)
+                slices = [ids[i:i + step] for i in range(0, len(ids), step)]
+                scored = await asyncio.gather(*(
+                    loop.run_in_executor(pool, compute_results_batch, [vectors[i] for i in part])
+                    for part in slices
+                ))
+
+                updates, inserts = [], []
+                now = datetime.now(timezone.utc)
+                for part, calcs in zip(slices, scored):
+                    for ev_id, calc in zip(part, calcs):
+                        transitions[(old.get(ev_id), calc["verdict"])] += 1
+                        values = {
+                            "evaluation_id": ev_id,
+                            "overall_pct": calc["overall_pct"],
+                            "verdict": calc["verdict"],
+                            "verdict_color": calc["verdict_color"],
+                            "areas": calc["areas"],
+                            "answered_questions": answered[ev_id],
+                            "computed_at": now,
+                        }
+                        (updates if ev_id in old else inserts).append(values)
+
+                if not dry_run:
+                    if updates:
+                        await db.execute(update(EvaluationResult), updates)
+                    if inserts:
+                        await db.execute(insert(EvaluationResult), inserts)
+                    await db.commit()
+
+            done += len(ids)
+            elapsed = time.monotonic() - started
+            print(f"[rescore] {done}/{total} ({done / elapsed:.0f}/s)")
+
+    changed = sum(n for (old_v, new_v), n in transitions.items() if old_v != new_v)
+    print(f"[rescore] Done: {done} rescored, {changed} verdict(s) changed.")
+    for (old_v, new_v), n in sorted(transitions.items(), key=lambda t: -t[1]):
+        if old_v != new_v:
+            print(f"[rescore]   {old_v or '(none)'} → {new_v}: {n}")
+    return transitions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rescore all completed evaluations.")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="evaluations per transaction")
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true", help="report verdict changes without writing")
+    args = parser.parse_args()
+
+    async def run():
+        await init_db()
+        await rescore_all(args.chunk, args.workers, args.dry_run)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+In-process cache of rendered result views (GET /api/result/{token}).
+
+Entries are keyed by evaluation token and hold the serialized response
+with its ETag and Last-Modified. record_answers() invalidates the token it
+touched. Each entry also records the computed_at of the stored result it
+was rendered from (None before completion) and get() treats a different
+one as a miss, so results completed on another worker or rewritten by
+backend.rescore are never served stale. Completed results stay until
+evicted (LRU) or RESULT_CACHE_TTL_SECONDS pass; in-progress results use
+the short RESULT_CACHE_PARTIAL_TTL_SECONDS, since answers handled by other
+workers don't invalidate this process' cache.
+"""
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "1024"))
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL_SECONDS", "3600"))
+RESULT_CACHE_PARTIAL_TTL = float(os.environ.get("RESULT_CACHE_PARTIAL_TTL_SECONDS", "5"))
+
+
+@dataclass
+class CachedResult:
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]
+    expires_at: float
+    version: Optional[datetime] = None  # EvaluationResult.computed_at
+
+
+class ResultCache:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, CachedResult] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, token: str, version: Optional[datetime] = None) -> Optional[CachedResult]:
+        entry = self._entries.get(token)
+        if entry is None or entry.expires_at <= time.monotonic() or entry.version != version:
+            if entry is not None:
+                del self._entries[token]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return entry
+
+    def put(
+        self, token: str, body: bytes, etag: str, last_modified: Optional[datetime], completed: bool,
+        version: Optional[datetime] = None,
+    ) -> CachedResult:
+        ttl = RESULT_CACHE_TTL if completed else RESULT_CACHE_PARTIAL_TTL
+        entry = CachedResult(body, etag, last_modified, time.monotonic() + ttl, version)
+        if self.maxsize > 0:
+            self._entries[token] = entry
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def invalidate(self, token: str):
+        if self._entries.pop(token, None) is not None:
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+        }
+
+
+result_cache = ResultCache(RESULT_CACHE_SIZE)
@@ -0,0 +1,109 @@
+"""
+Materialized evaluation results.
+
+Scores are computed once, when an evaluation flips to ``completed``, and
+stored in ``evaluation_results``. Read paths (admin list, result view) use
+the stored row instead of rescoring every response on each request.
+"""
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database import SessionLocal
+from backend.models import Evaluation, EvaluationResult, Response
+from backend.questions import (
+    QUESTION_INDEX, TOTAL_QUESTIONS, UNANSWERED, compute_results_batch, unpack_answers,
+)
+
+BACKFILL_BATCH = 200
+
+
+def result_row(evaluation_id: int, calc: dict, answered: int) -> EvaluationResult:
+    """Wrap a compute_results() dict in an (unsaved) EvaluationResult row."""
+    return EvaluationResult(
+        evaluation_id=evaluation_id,
+        overall_pct=calc["overall_pct"],
+        verdict=calc["verdict"],
+        verdict_color=calc["verdict_color"],
+        areas=calc["areas"],
+        answered_questions=answered,
+    )
+
+
+async def load_answer_vectors(db: AsyncSession, evaluation_ids) -> tuple[dict, dict]:
+    """
+    Answer vectors for several evaluations. Packed answers are used when the
+    evaluation has them; older evaluations fall back to one query over their
+    responses. Returns ({evaluation_id: vector}, {evaluation_id: answered count}).
+    """
+    vectors, answered, legacy = {}, {}, []
+    packed_result = await db.execute(
+        select(Evaluation.id, Evaluation.answers_packed).where(Evaluation.id.in_(evaluation_ids))
+    )
+    for ev_id, data in packed_result.all():
+        if data is None:
+            legacy.append(ev_id)
+            continue
+        vectors[ev_id] = unpack_answers(data)
+        answered[ev_id] = TOTAL_QUESTIONS - vectors[ev_id].count(UNANSWERED)
+    if not legacy:
+        return vectors, answered
+
+    for ev_id in legacy:
+        vectors[ev_id] = [UNANSWERED] * TOTAL_QUESTIONS
+        answered[ev_id] = 0
+    resp_result = await db.execute(
+        select(Response.evaluation_id, Response.question_id, Response.answer_value)
+        .where(Response.evaluation_id.in_(legacy))
+    )
+    for evaluation_id, question_id, answer_value in resp_result.all():
+        i = QUESTION_INDEX.get(question_id)
+        if i is not None:
+            vectors[evaluation_id][i] = answer_value
+        answered[evaluation_id] += 1
+    return vectors, answered
+
+
+async def materialize_results(db: AsyncSession, evs: list[Evaluation]) -> dict[int, EvaluationResult]:
+    """
+    Store results for ``evs`` using a single query for all their responses.
+    Caller commits. Returns {evaluation_id: EvaluationResult}.
+    """
+    if not evs:
+        return {}
+    vectors, answered = await load_answer_vectors(db, [ev.id for ev in evs])
+
+    rows = {}
+    calcs = compute_results_batch(vectors.values())
+    for evaluation_id, calc in zip(vectors, calcs):
+        rows[evaluation_id] = result_row(evaluation_id, calc, answered[evaluation_id])
+        db.add(rows[evaluation_id])
+    return rows
+
+
+async def backfill_results() -> int:
+    """Materialize results for completed evaluations that don't have one yet."""
+    total = 0
+    while True:
+        async with SessionLocal() as db:
+            result = await db.execute(
+                select(Evaluation)
+                .outerjoin(EvaluationResult, EvaluationResult.evaluation_id == Evaluation.id)
+                .where(Evaluation.status == "completed", EvaluationResult.evaluation_id.is_(None))
+                .limit(BACKFILL_BATCH)
+            )
+            pending = result.scalars().all()
+            if not pending:
+                break
+            await materialize_results(db, pending)
+            try:
+                await db.commit()
+            except IntegrityError:
+                # A concurrent request (e.g. the admin list) stored some of
+                # them first; the next batch picks up the rest
+                await db.rollback()
+                continue
+            total += len(pending)
+    if total:
+        print(f"[startup] Backfilled {total} evaluation result(s).")
+    return total
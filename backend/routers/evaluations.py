@@ -1,18 +1,30 @@
+import base64
+import json
 import uuid
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, or_, and_
+from sqlalchemy.exc import IntegrityError
 
-from backend.database import get_db
-from backend.models import Evaluation, Response
-from backend.schemas import EvaluationCreate, EvaluationOut, EvaluationSummary
-from backend.questions import compute_results
+from backend import export
+from backend.auth import require_role
+from backend.database import get_db, retry_on_busy
+from backend.models import Evaluation, EvaluationResult
+from backend.schemas import EvaluationCreate, EvaluationOut, EvaluationSummary, EvaluationPage
+from backend.result_store import materialize_results
 
-router = APIRouter(prefix="/api/evaluations", tags=["evaluations"])
+# Any logged-in admin user (see /api/admin/auth)
+router = APIRouter(
+    prefix="/api/evaluations",
+    tags=["evaluations"],
+    dependencies=[Depends(require_role())],
+)
 
 
-@router.post("", response_model=EvaluationOut)
-async def create_evaluation(data: EvaluationCreate, db: AsyncSession = Depends(get_db)):
+async def _insert_evaluation(db: AsyncSession, data: EvaluationCreate) -> Evaluation:
     token = str(uuid.uuid4())
     ev = Evaluation(
         token=token,
@@ -31,26 +43,139 @@ async def create_evaluation(data: EvaluationCreate, db: AsyncSession = Depends(g
     return ev
 
 
-@router.get("", response_model=list[EvaluationSummary])
-async def list_evaluations(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Evaluation).order_by(Evaluation.created_at.desc()))
-    evaluations = result.scalars().all()
-
-    summaries = []
-    for ev in evaluations:
-        overall_pct = None
-        verdict = None
-        if ev.status == "completed":
-            resp_result = await db.execute(
-                select(Response).where(Response.evaluation_id == ev.id)
-            )
-            responses = resp_result.scalars().all()
-            r_list = [{"question_id": r.question_id, "answer_value": r.answer_value} for r in responses]
-            calc = compute_results(r_list)
-            overall_pct = calc["overall_pct"]
-            verdict = calc["verdict"]
-
-        summaries.append(EvaluationSummary(
+@router.post("", response_model=EvaluationOut)
+async def create_evaluation(data: EvaluationCreate, db: AsyncSession = Depends(get_db)):
+    return await retry_on_busy(db, _insert_evaluation, data)
+
+
+# Sortable columns of the admin list; keyset order is (<column>, id)
+SORT_COLUMNS = {
+    "created_at": Evaluation.created_at,
+    "candidate_name": Evaluation.candidate_name,
+}
+SUMMARY_FIELDS = set(EvaluationSummary.model_fields)
+# Scores and verdicts: only these roles see them (the admin panel hides them from creators)
+RESULT_ROLES = ("admin", "evaluator")
+RESULT_FIELDS = {"overall_pct", "verdict"}
+
+
+def _encode_cursor(sort: str, value, ev_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, ev_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str, column) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cur_sort, value, ev_id = json.loads(raw)
+        if cur_sort != sort:
+            raise ValueError("sort mismatch")
+        if column is Evaluation.created_at:
+            value = datetime.fromisoformat(value)
+        return value, int(ev_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def _utc(value: datetime) -> datetime:
+    """``value`` as aware UTC (naive means UTC). SQLite stores times as naive UTC text."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _filter(query, status, company, position, verdict, created_from, created_to):
+    """Apply the admin list filters to a select joined to EvaluationResult."""
+    if status:
+        query = query.where(Evaluation.status == status)
+    if company:
+        query = query.where(Evaluation.company == company)
+    if position:
+        query = query.where(Evaluation.position == position)
+    if verdict:
+        query = query.where(EvaluationResult.verdict == verdict)
+    if created_from:
+        query = query.where(Evaluation.created_at >= _utc(created_from))
+    if created_to:
+        query = query.where(Evaluation.created_at < _utc(created_to))
+    return query
+
+
+@router.get("", response_model=EvaluationPage)
+async def list_evaluations(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    sort: str = "-created_at",
+    status: Optional[str] = None,
+    company: Optional[str] = None,
+    position: Optional[str] = None,
+    verdict: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    claims: dict = Depends(require_role()),
+):
+    """
+    One page of evaluations, newest first by default.
+    Pass the returned ``next_cursor`` back as ``cursor`` to get the next page.
+    ``fields`` is a comma-separated projection of EvaluationSummary fields.
+    Roles outside RESULT_ROLES get no scores and can't filter by verdict.
+    """
+    descending = sort.startswith("-")
+    sort_key = sort.lstrip("-")
+    column = SORT_COLUMNS.get(sort_key)
+    if column is None:
+        raise HTTPException(status_code=400, detail="Orden inválido")
+
+    include = None
+    if fields:
+        include = {f.strip() for f in fields.split(",") if f.strip()}
+        if not include or not include <= SUMMARY_FIELDS:
+            raise HTTPException(status_code=400, detail="Campos inválidos")
+    if claims["role"] not in RESULT_ROLES:
+        if verdict is not None or (include and include & RESULT_FIELDS):
+            raise HTTPException(status_code=403, detail="No tiene permiso para esta acción")
+        include = (include or SUMMARY_FIELDS) - RESULT_FIELDS
+
+    query = select(Evaluation, EvaluationResult).outerjoin(
+        EvaluationResult, EvaluationResult.evaluation_id == Evaluation.id
+    )
+    query = _filter(query, status, company, position, verdict, created_from, created_to)
+
+    if cursor:
+        value, last_id = _decode_cursor(cursor, sort, column)
+        if descending:
+            query = query.where(or_(column < value, and_(column == value, Evaluation.id < last_id)))
+        else:
+            query = query.where(or_(column > value, and_(column == value, Evaluation.id > last_id)))
+
+    if descending:
+        query = query.order_by(column.desc(), Evaluation.id.desc())
+    else:
+        query = query.order_by(column.asc(), Evaluation.id.asc())
+
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_cursor = _encode_cursor(sort, getattr(last, sort_key), last.id)
+
+    # Completed evaluations whose result was never stored (e.g. before the
+    # startup backfill ran) are materialized together in one extra query.
+    missing = [ev for ev, res in rows if res is None and ev.status == "completed"]
+    if missing:
+        stored = await materialize_results(db, missing)
+        rows = [(ev, res or stored.get(ev.id)) for ev, res in rows]
+
+    items = []
+    for ev, res in rows:
+        summary = EvaluationSummary(
             id=ev.id,
             token=ev.token,
             candidate_name=ev.candidate_name,
@@ -61,10 +186,58 @@ async def list_evaluations(db: AsyncSession = Depends(get_db)):
             status=ev.status,
             created_at=ev.created_at,
             completed_at=ev.completed_at,
-            overall_pct=overall_pct,
-            verdict=verdict,
-        ))
-    return summaries
+            overall_pct=res.overall_pct if res else None,
+            verdict=res.verdict if res else None,
+        )
+        items.append(summary.model_dump(include=include))
+
+    if missing:
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()  # a concurrent request stored them first
+    return EvaluationPage(items=items, next_cursor=next_cursor)
+
+
+# Scores per area and dimension: same roles that see results in the admin panel
+@router.get("/export", dependencies=[Depends(require_role(*RESULT_ROLES))])
+async def export_evaluations(
+    format: str = "csv",
+    sort: str = "-created_at",
+    status: Optional[str] = None,
+    company: Optional[str] = None,
+    position: Optional[str] = None,
+    verdict: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """
+    Every evaluation matching the list filters, with overall, area and
+    dimension percentages and verdict, as a CSV or XLSX download. Rows are
+    streamed from the database as the response is sent (see backend.export).
+    """
+    if format not in export.FORMATS:
+        raise HTTPException(status_code=400, detail="Formato inválido")
+    column = SORT_COLUMNS.get(sort.lstrip("-"))
+    if column is None:
+        raise HTTPException(status_code=400, detail="Orden inválido")
+
+    query = select(*export.COLUMNS).outerjoin(
+        EvaluationResult, EvaluationResult.evaluation_id == Evaluation.id
+    )
+    query = _filter(query, status, company, position, verdict, created_from, created_to)
+    if sort.startswith("-"):
+        query = query.order_by(column.desc(), Evaluation.id.desc())
+    else:
+        query = query.order_by(column.asc(), Evaluation.id.asc())
+
+    encode, media_type = export.FORMATS[format]
+    filename = f"evaluaciones-{datetime.now():%Y%m%d-%H%M}.{format}"
+    return StreamingResponse(
+        encode(export.stream_rows(query)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/{token}", response_model=EvaluationOut)
@@ -0,0 +1,66 @@
+"""
+The question bank as a single cacheable resource.
+
+Texts and options only (no scores or weights), serialized and gzipped once
+at import. The version is a hash of the content, so
+``/api/question-bank/{version}`` never changes and can be cached forever;
+``/api/question-bank`` always serves the current version with a short cache.
+"""
+import gzip
+import hashlib
+import json
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+
+from backend.questions import AREAS, OPTIONS, QUESTIONS
+
+router = APIRouter(prefix="/api/question-bank", tags=["questions"])
+
+_bank = {
+    "areas": {
+        key: {"name": area["name"], "dimensions": area["dimensions"]}
+        for key, area in AREAS.items()
+    },
+    "options": OPTIONS,
+    "questions": [
+        {
+            "id": q["id"],
+            "area": q["area"],
+            "dimension": q["dimension"],
+            "text": q["text"],
+            "options": q["options"],
+        }
+        for q in QUESTIONS
+    ],
+}
+BANK_VERSION = hashlib.sha256(
+    json.dumps(_bank, ensure_ascii=False, sort_keys=True).encode()
+).hexdigest()[:16]
+_bank["version"] = BANK_VERSION
+
+BANK_JSON = json.dumps(_bank, ensure_ascii=False, separators=(",", ":")).encode()
+BANK_GZIP = gzip.compress(BANK_JSON, compresslevel=9, mtime=0)
+BANK_ETAG = f'"{BANK_VERSION}"'
+
+
+def _bank_response(request: Request, cache_control: str) -> Response:
+    headers = {"ETag": BANK_ETAG, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") in (BANK_ETAG, f"W/{BANK_ETAG}"):
+        return Response(status_code=304, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(BANK_GZIP, media_type="application/json", headers=headers)
+    return Response(BANK_JSON, media_type="application/json", headers=headers)
+
+
+@router.get("")
+async def get_question_bank(request: Request):
+    return _bank_response(request, "public, max-age=300")
+
+
+@router.get("/{version}")
+async def get_question_bank_version(version: str, request: Request):
+    if version != BANK_VERSION:
+        raise HTTPException(status_code=404, detail="Versión del banco de preguntas no encontrada")
+    return _bank_response(request, "public, max-age=31536000, immutable")
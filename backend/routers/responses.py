@@ -1,75 +1,225 @@
+import os
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 
-from backend.database import get_db
+from backend.database import get_db, retry_on_busy, upsert
 from backend.models import Evaluation, Response
-from backend.schemas import AnswerIn, ProgressOut
-from backend.questions import QUESTIONS, TOTAL_QUESTIONS, get_next_unanswered
+from backend.schemas import AnswerIn, AnswerBatchIn, ProgressOut
+from backend.questions import (
+    QUESTION_INDEX, TOTAL_QUESTIONS, answers_to_vector, compute_results_packed, mask_from_packed,
+    next_unanswered_from_mask, pack_answers, pack_mask, set_packed_answer, unanswered_from_mask,
+    unpack_answers, unpack_mask,
+)
+from backend.result_cache import result_cache
+from backend.result_store import result_row
+from backend.routers.question_bank import BANK_VERSION
 
 router = APIRouter(prefix="/api/eval", tags=["responses"])
 
+# "rows": one Response row per answer plus the packed vector on the evaluation.
+# "packed": only the packed vector (see backend/pack_answers.py to convert old rows).
+ANSWER_STORAGE = os.environ.get("ANSWER_STORAGE", "rows")
 
-@router.post("/{token}/response")
-async def save_response(token: str, answer: AnswerIn, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Evaluation).where(Evaluation.token == token))
-    ev = result.scalar_one_or_none()
-    if not ev:
-        raise HTTPException(status_code=404, detail="Evaluación no encontrada")
-    if ev.status == "completed":
-        raise HTTPException(status_code=400, detail="La evaluación ya fue completada")
-
-    # Validate question_id
-    q = next((q for q in QUESTIONS if q["id"] == answer.question_id), None)
-    if not q:
-        raise HTTPException(status_code=400, detail="Pregunta inválida")
-    if answer.answer_value not in (0, 1, 2):
-        raise HTTPException(status_code=400, detail="Valor de respuesta inválido")
-
-    # Upsert response (allow re-answering same question)
-    existing = await db.execute(
-        select(Response).where(
-            Response.evaluation_id == ev.id,
-            Response.question_id == answer.question_id,
-        )
+# Attempts before giving up when concurrent answers keep racing on the same evaluation
+ANSWER_RETRIES = 3
+
+
+async def get_answer_state(db: AsyncSession, ev: Evaluation) -> tuple[int, bytes | None]:
+    """
+    (answered bitmap, packed answers) of ``ev``. Rows created before these
+    columns existed have them NULL; they are rebuilt from the evaluation's
+    responses (and written back by the next answer).
+    """
+    if ev.answers_packed is not None or ev.status == "pending":
+        if ev.answered_mask is not None:
+            return unpack_mask(ev.answered_mask), ev.answers_packed
+        return mask_from_packed(ev.answers_packed), ev.answers_packed
+    resp_result = await db.execute(
+        select(Response.question_id, Response.answer_value).where(Response.evaluation_id == ev.id)
     )
-    resp = existing.scalar_one_or_none()
-    if resp:
-        resp.answer_value = answer.answer_value
-        resp.answered_at = datetime.now(timezone.utc)
+    packed = pack_answers(answers_to_vector(
+        [{"question_id": qid, "answer_value": val} for qid, val in resp_result.all()]
+    ))
+    return mask_from_packed(packed), packed
+
+
+async def get_answered_mask(db: AsyncSession, ev: Evaluation) -> int:
+    """Answered-question bitmap of ``ev`` (see get_answer_state)."""
+    if ev.answered_mask is not None or ev.status == "pending":
+        return unpack_mask(ev.answered_mask)
+    if ev.status == "completed":
+        return (1 << TOTAL_QUESTIONS) - 1
+    mask, _ = await get_answer_state(db, ev)
+    return mask
+
+
+# Largest batch accepted by POST /{token}/responses
+MAX_BATCH = 2 * TOTAL_QUESTIONS
+# Most upcoming questions returned for clients that queue answers locally
+MAX_LOOKAHEAD = 20
+
+
+def progress_payload(status: str, mask: int, answered: int, lookahead: int = 0, compact: bool = False) -> dict:
+    """
+    Progress returned with every answer. ``compact`` clients keep the question
+    bank (see routers/question_bank.py) and only receive question ids.
+    """
+    next_q = next_unanswered_from_mask(mask)
+    progress = {
+        "status": status,
+        "answered": answered,
+        "total": TOTAL_QUESTIONS,
+        "bank_version": BANK_VERSION,
+        "next_question_id": next_q["id"] if next_q else None,
+    }
+    upcoming = unanswered_from_mask(mask, lookahead) if lookahead else None
+    if compact:
+        if upcoming is not None:
+            progress["upcoming"] = [q["id"] for q in upcoming]
     else:
-        resp = Response(
-            evaluation_id=ev.id,
-            question_id=answer.question_id,
-            answer_value=answer.answer_value,
+        progress["next_question"] = next_q
+        if upcoming is not None:
+            progress["upcoming"] = upcoming
+    return progress
+
+
+def _answer_time(answer: AnswerIn, now: datetime) -> datetime:
+    """Client timestamp of a queued answer, never later than ``now``."""
+    ts = answer.answered_at
+    if ts is None:
+        return now
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return min(ts, now)
+
+
+async def record_answers(
+    db: AsyncSession, token: str, answers: list[AnswerIn], lookahead: int = 0, compact: bool = False,
+) -> dict:
+    """
+    Apply ``answers`` in order in a single transaction. Progress and the
+    packed answers live on the evaluation row (answered_count, answered_mask,
+    answers_packed), which is updated with a compare-and-swap on the previous
+    values so concurrent answers can't lose each other's writes.
+    """
+    for _ in range(ANSWER_RETRIES):
+        result = await db.execute(
+            select(Evaluation).where(Evaluation.token == token).execution_options(populate_existing=True)
         )
-        db.add(resp)
+        ev = result.scalar_one_or_none()
+        if not ev:
+            raise HTTPException(status_code=404, detail="Evaluación no encontrada")
+
+        # Validate every answer before writing anything; the last answer to a question wins
+        now = datetime.now(timezone.utc)
+        latest = {}  # QUESTIONS index → (answer, answered_at)
+        for answer in answers:
+            index = QUESTION_INDEX.get(answer.question_id)
+            if index is None:
+                raise HTTPException(status_code=400, detail="Pregunta inválida")
+            if answer.answer_value not in (0, 1, 2):
+                raise HTTPException(status_code=400, detail="Valor de respuesta inválido")
+            latest[index] = (answer, _answer_time(answer, now))
 
-    # Update progress
-    ev.status = "in_progress"
-    ev.current_question = answer.question_id
+        mask, packed = await get_answer_state(db, ev)
+        if ev.status == "completed":
+            # A client resending its last batch (its response was lost) gets
+            # the same outcome; changing a completed evaluation is refused
+            stored = unpack_answers(packed) if packed else None
+            if stored and all(stored[i] == a.answer_value for i, (a, _) in latest.items()):
+                return progress_payload("completed", mask, mask.bit_count(), lookahead, compact)
+            raise HTTPException(status_code=400, detail="La evaluación ya fue completada")
 
-    await db.commit()
+        new_mask, new_packed = mask, packed
+        rows = []
+        for index, (answer, answered_at) in latest.items():
+            new_mask |= 1 << index
+            new_packed = set_packed_answer(new_packed, index, answer.answer_value)
+            rows.append({
+                "evaluation_id": ev.id,
+                "question_id": answer.question_id,
+                "answer_value": answer.answer_value,
+                "answered_at": answered_at,
+            })
 
-    # Find next unanswered question
-    all_resp = await db.execute(select(Response).where(Response.evaluation_id == ev.id))
-    answered_ids = {r.question_id for r in all_resp.scalars().all()}
-    next_q = get_next_unanswered(answered_ids)
+        # Upsert responses (allow re-answering same question)
+        if ANSWER_STORAGE == "rows":
+            stmt = upsert(Response.__table__).values(rows)
+            await db.execute(stmt.on_conflict_do_update(
+                index_elements=["evaluation_id", "question_id"],
+                set_={"answer_value": stmt.excluded.answer_value, "answered_at": stmt.excluded.answered_at},
+            ))
 
-    if next_q is None:
-        # All questions answered — mark as completed
-        ev.status = "completed"
-        ev.completed_at = datetime.now(timezone.utc)
+        # Update progress
+        answered = new_mask.bit_count()
+        next_q = next_unanswered_from_mask(new_mask)
+        values = {
+            "answers_packed": new_packed,
+            "answered_mask": pack_mask(new_mask),
+            "answered_count": answered,
+            "current_question": answers[-1].question_id,
+            "status": "in_progress",
+        }
+        if next_q is None:
+            # All questions answered — mark as completed
+            values["status"] = "completed"
+            values["completed_at"] = now
+
+        previous = [
+            col.is_(None) if old is None else col == old
+            for col, old in (
+                (Evaluation.answered_mask, ev.answered_mask),
+                (Evaluation.answers_packed, ev.answers_packed),
+            )
+        ]
+        swapped = await db.execute(
+            update(Evaluation).where(Evaluation.id == ev.id, *previous).values(**values)
+        )
+        if swapped.rowcount == 0:
+            # Another answer for this evaluation committed first; start over
+            await db.rollback()
+            continue
+
+        if next_q is None:
+            db.add(result_row(ev.id, compute_results_packed(new_packed), answered))
         await db.commit()
-        return {"status": "completed", "next_question": None, "answered": len(answered_ids), "total": TOTAL_QUESTIONS}
+        result_cache.invalidate(token)
 
-    return {
-        "status": "in_progress",
-        "next_question": next_q,
-        "answered": len(answered_ids),
-        "total": TOTAL_QUESTIONS,
-    }
+        return progress_payload(values["status"], new_mask, answered, lookahead, compact)
+
+    raise HTTPException(status_code=409, detail="Respuesta en conflicto, intente de nuevo")
+
+
+@router.post("/{token}/response")
+async def save_response(
+    token: str,
+    answer: AnswerIn,
+    compact: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    return await retry_on_busy(db, record_answers, token, [answer], compact=compact)
+
+
+@router.post("/{token}/responses")
+async def save_responses(
+    token: str,
+    batch: AnswerBatchIn,
+    lookahead: int = Query(0, ge=0, le=MAX_LOOKAHEAD),
+    compact: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Apply a batch of answers queued by the client (e.g. on a flaky mobile
+    connection) in one transaction. ``lookahead`` returns the next unanswered
+    questions as ``upcoming`` so the client can keep answering offline.
+    """
+    if not batch.answers:
+        raise HTTPException(status_code=400, detail="Sin respuestas")
+    if len(batch.answers) > MAX_BATCH:
+        raise HTTPException(status_code=400, detail="Demasiadas respuestas en un solo envío")
+    return await retry_on_busy(db, record_answers, token, batch.answers, lookahead, compact)
 
 
 @router.get("/{token}/progress", response_model=ProgressOut)
@@ -79,12 +229,10 @@ async def get_progress(token: str, db: AsyncSession = Depends(get_db)):
     if not ev:
         raise HTTPException(status_code=404, detail="Evaluación no encontrada")
 
-    resp_result = await db.execute(select(Response).where(Response.evaluation_id == ev.id))
-    answered_ids = {r.question_id for r in resp_result.scalars().all()}
-    next_q = get_next_unanswered(answered_ids)
+    next_q = next_unanswered_from_mask(await get_answered_mask(db, ev))
 
     return ProgressOut(
-        answered=len(answered_ids),
+        answered=ev.answered_count,
         total=TOTAL_QUESTIONS,
         current_question=next_q["id"] if next_q else 0,
         status=ev.status,
@@ -92,16 +240,23 @@ async def get_progress(token: str, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/{token}/next-question")
-async def get_next_question(token: str, db: AsyncSession = Depends(get_db)):
-    """Returns the next unanswered question and overall progress."""
+async def get_next_question(
+    token: str,
+    lookahead: int = Query(0, ge=0, le=MAX_LOOKAHEAD),
+    compact: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Returns the next unanswered question and overall progress, plus the
+    following ``lookahead`` unanswered questions as ``upcoming``. With
+    ``compact`` only question ids are returned.
+    """
     result = await db.execute(select(Evaluation).where(Evaluation.token == token))
     ev = result.scalar_one_or_none()
     if not ev:
         raise HTTPException(status_code=404, detail="Evaluación no encontrada")
 
-    resp_result = await db.execute(select(Response).where(Response.evaluation_id == ev.id))
-    answered_ids = {r.question_id for r in resp_result.scalars().all()}
-    next_q = get_next_unanswered(answered_ids)
+    mask = await get_answered_mask(db, ev)
 
     return {
         "evaluation": {
@@ -111,7 +266,5 @@ async def get_next_question(token: str, db: AsyncSession = Depends(get_db)):
             "company": ev.company,
             "status": ev.status,
         },
-        "answered": len(answered_ids),
-        "total": TOTAL_QUESTIONS,
-        "next_question": next_q,
+        **progress_payload(ev.status, mask, ev.answered_count, lookahead, compact),
     }
@@ -1,34 +1,94 @@
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from backend.database import get_db
-from backend.models import Evaluation, Response
+from backend.models import Evaluation, EvaluationResult
 from backend.schemas import ResultOut
-from backend.questions import compute_results, TOTAL_QUESTIONS
+from backend.questions import score_vector, TOTAL_QUESTIONS
+from backend.result_cache import CachedResult, result_cache
+from backend.result_store import load_answer_vectors
 
 router = APIRouter(prefix="/api/result", tags=["results"])
 
 
+def _not_modified(request: Request, entry: CachedResult) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        return entry.etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and entry.last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)  # "-0000" offset
+        return entry.last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def _result_response(request: Request, entry: CachedResult) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if entry.last_modified:
+        headers["Last-Modified"] = format_datetime(entry.last_modified, usegmt=True)
+    if _not_modified(request, entry):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+
 @router.get("/{token}", response_model=ResultOut)
-async def get_result(token: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Evaluation).where(Evaluation.token == token))
-    ev = result.scalar_one_or_none()
-    if not ev:
+async def get_result(token: str, request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Result report of an evaluation, served from result_cache when possible.
+    Responses carry an ETag (and Last-Modified once completed) so clients
+    can revalidate and get a 304.
+    """
+    # Only the stored result's version is read before trying the cache
+    result = await db.execute(
+        select(Evaluation.id, EvaluationResult.computed_at)
+        .outerjoin(EvaluationResult, EvaluationResult.evaluation_id == Evaluation.id)
+        .where(Evaluation.token == token)
+    )
+    found = result.one_or_none()
+    if not found:
         raise HTTPException(status_code=404, detail="Evaluación no encontrada")
+    ev_id, version = found
 
-    resp_result = await db.execute(
-        select(Response).where(Response.evaluation_id == ev.id)
-    )
-    responses = resp_result.scalars().all()
+    entry = result_cache.get(token, version)
+    if entry:
+        return _result_response(request, entry)
+
+    ev = await db.get(Evaluation, ev_id)
+    stored = await db.get(EvaluationResult, ev_id)
+    if stored:
+        calc = {
+            "overall_pct": stored.overall_pct,
+            "verdict": stored.verdict,
+            "verdict_color": stored.verdict_color,
+            "areas": stored.areas,
+        }
+        answered = stored.answered_questions
+        last_modified = max(filter(None, (ev.completed_at, stored.computed_at)), default=None)
+    else:
+        # Not completed yet: score whatever has been answered so far
+        vectors, counts = await load_answer_vectors(db, [ev.id])
+        answered = counts.get(ev.id, 0)
 
-    if not responses:
-        raise HTTPException(status_code=400, detail="Sin respuestas registradas")
+        if not answered:
+            raise HTTPException(status_code=400, detail="Sin respuestas registradas")
 
-    r_list = [{"question_id": r.question_id, "answer_value": r.answer_value} for r in responses]
-    calc = compute_results(r_list)
+        calc = score_vector(vectors[ev.id])
+        last_modified = None
 
-    return ResultOut(
+    body = ResultOut(
         token=ev.token,
         candidate_name=ev.candidate_name,
         candidate_id=ev.candidate_id,
@@ -40,5 +100,12 @@ async def get_result(token: str, db: AsyncSession = Depends(get_db)):
         verdict_color=calc["verdict_color"],
         areas=calc["areas"],
         total_questions=TOTAL_QUESTIONS,
-        answered_questions=len(responses),
-    )
+        answered_questions=answered,
+    ).model_dump_json().encode()
+
+    if last_modified and last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)  # SQLite returns naive UTC
+    version = stored.computed_at if stored else None
+    etag = f'"{hashlib.sha256(body + str(version).encode()).hexdigest()[:16]}"'
+    entry = result_cache.put(token, body, etag, last_modified, completed=stored is not None, version=version)
+    return _result_response(request, entry)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Any, Optional
 from datetime import datetime
 
 
@@ -48,11 +48,21 @@ class EvaluationSummary(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class EvaluationPage(BaseModel):
+    items: list[dict[str, Any]]   # EvaluationSummary, optionally projected with ?fields=
+    next_cursor: Optional[str] = None
+
+
 # ── Response ─────────────────────────────────────────────────────────────────
 
 class AnswerIn(BaseModel):
     question_id: int
     answer_value: int  # 0 | 1 | 2
+    answered_at: Optional[datetime] = None  # client timestamp (queued answers)
+
+
+class AnswerBatchIn(BaseModel):
+    answers: list[AnswerIn]  # in the order they were given; later ones win
 
 
 class ProgressOut(BaseModel):
@@ -0,0 +1,293 @@
+"""
+Synthetic evaluations for testing indexes, pagination and cleanup at scale.
+
+    python -m bench.generate --db big.db [--evaluations 20000] [--companies 40]
+                             [--positions 60] [--days 365] [--end YYYY-MM-DD]
+                             [--status completed=0.75,in_progress=0.15,pending=0.10]
+                             [--storage rows|packed] [--batch 1000] [--seed 1]
+
+Creates the schema through the migrations if needed, then appends
+evaluations with ids after the current maximum, so it can be run again on
+the same file to grow it. Each evaluation gets:
+
+- a company and a position drawn with skewed (Zipf-like) frequencies, so a
+  few companies own most rows as in a real deployment, and creation times
+  spread over the --days days before --end, in working hours;
+- answers in QUESTIONS order (the order candidates get them in): all of
+  them when completed, a random prefix when in progress, none when
+  pending. Every candidate has a trait level per dimension and a tendency
+  to answer "A veces / Depende", so scores cluster by dimension and the
+  verdicts come out mixed instead of uniform;
+- the answered bitmap, packed answers and answered count the app keeps on
+  ``evaluations``, ``responses`` rows unless --storage packed (same meaning
+  as ANSWER_STORAGE), and for completed evaluations the materialized
+  ``evaluation_results`` row.
+
+Rows go in with sqlite3 executemany, one transaction per --batch
+evaluations, with synchronous=OFF while loading (a crash mid-run can lose
+the file: this is for fixtures only). SQLite only. The same --seed, --end
+and options produce the same rows on the same starting file.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+FIRST_NAMES = [
+    "María", "José", "Luis", "Ana", "Carlos", "Lucía", "Jorge", "Sofía", "Andrés", "Gabriela",
+    "Miguel", "Valentina", "Diego", "Camila", "Fernando", "Daniela", "Pablo", "Paula", "Javier",
+    "Andrea", "Ricardo", "Verónica", "Santiago", "Carolina", "Mateo", "Fernanda", "Juan", "Isabel",
+    "Roberto", "Natalia", "Esteban", "Mónica", "Cristian", "Patricia", "Raúl", "Elena",
+]
+LAST_NAMES = [
+    "García", "Rodríguez", "Martínez", "López", "González", "Pérez", "Sánchez", "Ramírez", "Torres",
+    "Flores", "Rivera", "Gómez", "Díaz", "Cruz", "Morales", "Reyes", "Ortiz", "Gutiérrez", "Chávez",
+    "Ramos", "Vargas", "Castillo", "Jiménez", "Moreno", "Romero", "Herrera", "Medina", "Aguilar",
+    "Vega", "Castro", "Mendoza", "Ruiz", "Álvarez", "Salazar", "Navarro", "Zambrano",
+]
+COMPANY_WORDS = [
+    "Andina", "Pacífico", "Austral", "Horizonte", "Cóndor", "Sierra", "Litoral", "Volcán", "Aurora",
+    "Amazonas", "Galápagos", "Cotopaxi", "Nevado", "Mirador", "Cumbre", "Laguna",
+]
+COMPANY_KINDS = [
+    "Transportes", "Seguridad", "Logística", "Constructora", "Servicios", "Minera", "Alimentos",
+    "Comercial", "Farmacéutica", "Energía",
+]
+POSITION_ROLES = [
+    "Conductor", "Guardia", "Operador", "Supervisor", "Analista", "Asistente", "Técnico", "Jefe",
+    "Coordinador", "Auxiliar", "Vendedor", "Inspector",
+]
+POSITION_AREAS = [
+    "de Turno", "de Bodega", "de Planta", "Administrativo", "de Ventas", "de Mantenimiento",
+    "de Seguridad", "de Calidad", "de Despacho", "de Campo",
+]
+
+DEFAULT_STATUS_MIX = "completed=0.75,in_progress=0.15,pending=0.10"
+SECONDS_PER_ANSWER = 9.0  # median time a candidate spends per question
+
+
+def _sqlite_time(dt: datetime) -> str:
+    # Same text format SQLAlchemy's SQLite DateTime type stores (UTC, no offset)
+    return dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _zipf_weights(n: int, s: float = 1.1) -> list[float]:
+    return [1 / (k + 1) ** s for k in range(n)]
+
+
+def _parse_day(text: str) -> datetime:
+    return datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+
+def parse_status_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        status, _, share = part.partition("=")
+        if status.strip() not in ("completed", "in_progress", "pending"):
+            raise argparse.ArgumentTypeError(f"unknown status {status!r}")
+        mix[status.strip()] = float(share)
+    return mix
+
+
+class Generator:
+    """Draws evaluations (rows for the three tables) from a seeded Random."""
+
+    def __init__(self, rng: random.Random, companies: int, positions: int, days: float,
+                 status_mix: dict[str, float], end: datetime):
+        from backend import questions as q
+
+        self.q = q
+        self.rng = rng
+        self.end = end
+        self.days = days
+        names = [f"{kind} {word}" for word in COMPANY_WORDS for kind in COMPANY_KINDS]
+        rng.shuffle(names)
+        self.companies = [f"{name} S.A." for name in names[:companies]] or [None]
+        roles = [f"{role} {area}" for role in POSITION_ROLES for area in POSITION_AREAS]
+        rng.shuffle(roles)
+        self.positions = roles[:positions] or [None]
+        self.company_weights = _zipf_weights(len(self.companies))
+        self.position_weights = _zipf_weights(len(self.positions))
+        self.statuses = list(status_mix)
+        self.status_weights = list(status_mix.values())
+        # Answer index (0 = "De acuerdo") that scores best on each question
+        self.favorable = [question["scores"].index(max(question["scores"])) for question in q.QUESTIONS]
+
+    def _created_at(self) -> datetime:
+        day = self.end - timedelta(days=self.rng.uniform(0, self.days))
+        hour = min(23.9, max(7.0, self.rng.gauss(12.5, 2.5)))  # working hours
+        created = day.replace(hour=int(hour), minute=int(hour % 1 * 60), second=self.rng.randrange(60))
+        return created if created < self.end else created - timedelta(days=1)
+
+    def _answers(self, count: int) -> list[int]:
+        """Answer values of the first ``count`` questions for one candidate."""
+        rng, q = self.rng, self.q
+        level = rng.betavariate(5, 2.2)  # most candidates score well, with a long low tail
+        traits = [min(0.98, max(0.02, rng.gauss(level, 0.12))) for _ in q.DIMENSIONS]
+        hedging = rng.uniform(0.05, 0.35)  # share of "A veces / Depende"
+        answers = []
+        for i in range(count):
+            fav = self.favorable[i]
+            r = rng.random()
+            if r < hedging:
+                answers.append(1)
+            elif r < hedging + (1 - hedging) * traits[q.Q_DIM[i]]:
+                answers.append(fav)
+            else:
+                answers.append(2 - fav)
+        return answers
+
+    def evaluation(self, ev_id: int):
+        """(evaluation row, response rows, result row or None) for one evaluation."""
+        rng, q = self.rng, self.q
+        status = rng.choices(self.statuses, self.status_weights)[0]
+        created_at = self._created_at()
+        if status == "completed":
+            count = q.TOTAL_QUESTIONS
+        elif status == "in_progress":
+            count = rng.randrange(1, q.TOTAL_QUESTIONS)
+        else:
+            count = 0
+        answers = self._answers(count)
+
+        responses = []
+        answered_at = created_at + timedelta(minutes=rng.expovariate(1 / 30))  # link opened later
+        for i, value in enumerate(answers):
+            answered_at += timedelta(seconds=rng.lognormvariate(math.log(SECONDS_PER_ANSWER), 0.6))
+            responses.append((ev_id, q.QUESTIONS[i]["id"], value, _sqlite_time(answered_at)))
+
+        vector = answers + [q.UNANSWERED] * (q.TOTAL_QUESTIONS - count)
+        mask = (1 << count) - 1
+        completed_at = _sqlite_time(answered_at) if status == "completed" else None
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        evaluation = (
+            ev_id,
+            str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            f"{first} {last} {rng.choice(LAST_NAMES)}",
+            f"{rng.randrange(10 ** 9, 10 ** 10)}",
+            f"{first}.{last}{rng.randrange(1000)}@example.com".lower(),
+            f"09{rng.randrange(10 ** 8):08d}",
+            rng.choices(self.positions, self.position_weights)[0],
+            rng.choices(self.companies, self.company_weights)[0],
+            status,
+            q.QUESTIONS[count - 1]["id"] if count else 0,
+            count,
+            q.pack_mask(mask) if count else None,
+            q.pack_answers(vector) if count else None,
+            _sqlite_time(created_at),
+            completed_at,
+        )
+
+        result = None
+        if status == "completed":
+            calc = q.score_vector(vector)
+            result = (
+                ev_id, calc["overall_pct"], calc["verdict"], calc["verdict_color"],
+                json.dumps(calc["areas"]), count, completed_at,
+            )
+        return evaluation, responses, result
+
+
+INSERT_EVALUATION = """
+    INSERT INTO evaluations (
+        id, token, candidate_name, candidate_id, candidate_email, candidate_phone, position, company,
+        status, current_question, answered_count, answered_mask, answers_packed, created_at, completed_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_RESPONSE = "INSERT INTO responses (evaluation_id, question_id, answer_value, answered_at) VALUES (?, ?, ?, ?)"
+INSERT_RESULT = """
+    INSERT INTO evaluation_results (
+        evaluation_id, overall_pct, verdict, verdict_color, areas, answered_questions, computed_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def generate(db_path: str, args) -> dict:
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-200000")
+    next_id = (conn.execute("SELECT coalesce(max(id), 0) FROM evaluations").fetchone()[0]) + 1
+
+    rng = random.Random(args.seed)
+    gen = Generator(rng, args.companies, args.positions, args.days, args.status, args.end)
+    # Same companies and positions on every run; rows (tokens included) also
+    # depend on where this run starts, so growing a file doesn't repeat them
+    rng.seed(f"{args.seed}:{next_id}")
+
+    totals = {"evaluations": 0, "responses": 0, "results": 0}
+    started = time.perf_counter()
+    try:
+        for batch_start in range(0, args.evaluations, args.batch):
+            evaluations, responses, results = [], [], []
+            for ev_id in range(next_id + batch_start, next_id + min(batch_start + args.batch, args.evaluations)):
+                evaluation, rows, result = gen.evaluation(ev_id)
+                evaluations.append(evaluation)
+                if args.storage == "rows":
+                    responses += rows
+                if result is not None:
+                    results.append(result)
+
+            conn.execute("BEGIN")
+            conn.executemany(INSERT_EVALUATION, evaluations)
+            conn.executemany(INSERT_RESPONSE, responses)
+            conn.executemany(INSERT_RESULT, results)
+            conn.execute("COMMIT")
+
+            totals["evaluations"] += len(evaluations)
+            totals["responses"] += len(responses)
+            totals["results"] += len(results)
+            elapsed = time.perf_counter() - started
+            print(f"[generate] {totals['evaluations']}/{args.evaluations} evaluations, "
+                  f"{totals['responses']} responses ({totals['responses'] / elapsed * 60:,.0f}/min)",
+                  file=sys.stderr)
+        conn.execute("ANALYZE")  # fresh planner statistics for the new distribution
+    finally:
+        conn.close()
+    totals["seconds"] = round(time.perf_counter() - started, 2)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a SQLite database with synthetic evaluations.")
+    parser.add_argument("--db", default=os.environ.get("DB_PATH", "evamed.db"), help="SQLite file")
+    parser.add_argument("--evaluations", type=int, default=20000)
+    parser.add_argument("--companies", type=int, default=40, help=f"at most {len(COMPANY_WORDS) * len(COMPANY_KINDS)}")
+    parser.add_argument("--positions", type=int, default=60, help=f"at most {len(POSITION_ROLES) * len(POSITION_AREAS)}")
+    parser.add_argument("--days", type=float, default=365, help="spread of creation times, back from --end")
+    parser.add_argument("--end", type=_parse_day, default=datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+                        help="evaluations are created before this day, YYYY-MM-DD UTC (default: today)")
+    parser.add_argument("--status", type=parse_status_mix, default=parse_status_mix(DEFAULT_STATUS_MIX),
+                        help=f"status shares (default {DEFAULT_STATUS_MIX})")
+    parser.add_argument("--storage", choices=("rows", "packed"), default=os.environ.get("ANSWER_STORAGE", "rows"),
+                        help="packed: no responses rows, like ANSWER_STORAGE=packed")
+    parser.add_argument("--batch", type=int, default=1000, help="evaluations per transaction")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # Must be set before backend.database is imported; always the --db file
+    os.environ["DB_PATH"] = args.db
+    os.environ.pop("DATABASE_URL", None)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from backend.database import engine, init_db
+
+    async def create_schema():
+        await init_db()
+        await engine.dispose()
+
+    asyncio.run(create_schema())
+    totals = generate(args.db, args)
+    print(f"[generate] {args.db}: {totals['evaluations']} evaluations, {totals['responses']} responses, "
+          f"{totals['results']} results in {totals['seconds']}s "
+          f"({totals['responses'] / totals['seconds'] * 60:,.0f} responses/min)")
+
+
+if __name__ == "__main__":
+    main()
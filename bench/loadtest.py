@@ -0,0 +1,240 @@
+"""
+Load test with concurrent virtual candidates.
+
+    python -m bench.loadtest [--candidates 50] [--admins 2] [--think-ms 0]
+                             [--url http://127.0.0.1:8000] [--db PATH]
+                             [--save bench/baseline.json] [--compare bench/baseline.json]
+
+Every virtual candidate creates an evaluation (as the admin user), walks
+next-question → response through every question in QUESTIONS and fetches
+its result; meanwhile ``--admins`` users keep paging /api/evaluations.
+Without --url the app runs in-process through httpx's ASGI transport on a
+temporary SQLite database (or --db), lifespan included; with --url it
+targets a running server (ADMIN_PASS must match).
+
+The report gives, per endpoint, request count, throughput, p50/p95/p99
+latency, 409 conflicts and "database is locked" errors. --save writes it
+as JSON; --compare prints the change against a saved report. Needs httpx
+(pip install httpx).
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import httpx
+
+ADMIN_USER = "admin"
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values)) - 1  # nearest rank
+    return sorted_values[max(0, min(rank, len(sorted_values) - 1))]
+
+
+class Recorder:
+    """Latencies and failures per endpoint label ("POST /api/eval/{token}/response")."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.lock_errors = defaultdict(int)
+
+    async def call(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception as e:  # in-process: the app's own exception
+            self.latencies[label].append(time.perf_counter() - started)
+            if "database is locked" in str(e).lower():
+                self.lock_errors[label] += 1
+            self.statuses[label]["error"] += 1
+            return None
+        self.latencies[label].append(time.perf_counter() - started)
+        self.statuses[label][str(response.status_code)] += 1
+        if response.status_code >= 500 and "locked" in response.text.lower():
+            self.lock_errors[label] += 1
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for label, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            statuses = dict(self.statuses[label])
+            endpoints[label] = {
+                "requests": len(values),
+                "rps": round(len(values) / elapsed, 1),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2),
+                "statuses": statuses,
+                "conflicts": statuses.get("409", 0),
+                "lock_errors": self.lock_errors[label],
+            }
+        total = sum(e["requests"] for e in endpoints.values())
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "requests": total,
+            "rps": round(total / elapsed, 1),
+            "lock_errors": sum(self.lock_errors.values()),
+            "endpoints": endpoints,
+        }
+
+
+async def candidate(client, rec: Recorder, admin_headers: dict, think: float):
+    r = await rec.call(client, "POST /api/evaluations", "POST", "/api/evaluations",
+                       headers=admin_headers, json={"candidate_name": f"Load {random.randrange(10**6)}"})
+    if r is None or r.status_code != 200:
+        return False
+    token = r.json()["token"]
+
+    r = await rec.call(client, "GET /api/eval/{token}/next-question", "GET",
+                       f"/api/eval/{token}/next-question", params={"compact": 1})
+    while r is not None and r.status_code == 200 and r.json()["next_question_id"] is not None:
+        if think:
+            await asyncio.sleep(random.uniform(0, 2 * think))
+        answer = {"question_id": r.json()["next_question_id"], "answer_value": random.randint(0, 2)}
+        r = await rec.call(client, "POST /api/eval/{token}/response", "POST",
+                           f"/api/eval/{token}/response", params={"compact": 1}, json=answer)
+        if r is not None and r.status_code == 409:
+            r = await rec.call(client, "GET /api/eval/{token}/next-question", "GET",
+                               f"/api/eval/{token}/next-question", params={"compact": 1})
+    if r is None or r.status_code != 200:
+        return False
+
+    r = await rec.call(client, "GET /api/result/{token}", "GET", f"/api/result/{token}")
+    return r is not None and r.status_code == 200
+
+
+async def admin_lister(client, rec: Recorder, admin_headers: dict, done: asyncio.Event):
+    while not done.is_set():
+        cursor = None
+        for _ in range(3):  # first pages only, like the admin panel
+            params = {"limit": 50}
+            if cursor:
+                params["cursor"] = cursor
+            r = await rec.call(client, "GET /api/evaluations", "GET", "/api/evaluations",
+                               headers=admin_headers, params=params)
+            if r is None or r.status_code != 200:
+                break
+            cursor = r.json()["next_cursor"]
+            if not cursor:
+                break
+        await asyncio.sleep(0.05)
+
+
+async def run(args) -> dict:
+    if args.url:
+        transport, base_url, app = None, args.url, None
+    else:
+        from backend.main import app
+        transport, base_url = httpx.ASGITransport(app=app), "http://loadtest"
+
+    limits = httpx.Limits(max_connections=args.candidates + args.admins + 10)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60, limits=limits) as client:
+        lifespan = app.router.lifespan_context(app) if app else None
+        if lifespan:
+            await lifespan.__aenter__()
+        try:
+            r = await client.post("/api/admin/auth", json={"username": ADMIN_USER, "password": args.admin_pass})
+            admin_headers = {"Authorization": f"Bearer {r.json()['token']}"}
+
+            rec = Recorder()
+            done = asyncio.Event()
+            started = time.perf_counter()
+            listers = [asyncio.create_task(admin_lister(client, rec, admin_headers, done))
+                       for _ in range(args.admins)]
+            finished = await asyncio.gather(*(
+                candidate(client, rec, admin_headers, args.think_ms / 1000) for _ in range(args.candidates)
+            ))
+            done.set()
+            await asyncio.gather(*listers)
+            elapsed = time.perf_counter() - started
+        finally:
+            if lifespan:
+                await lifespan.__aexit__(None, None, None)
+
+    report = rec.report(elapsed)
+    report["completed_candidates"] = sum(finished)
+    report["meta"] = {
+        "commit": _git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "candidates": args.candidates,
+        "admins": args.admins,
+        "think_ms": args.think_ms,
+        "target": args.url or "in-process",
+        "python": platform.python_version(),
+    }
+    return report
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def print_report(report: dict, baseline: dict | None = None):
+    meta = report["meta"]
+    print(f"\n{meta['candidates']} candidates, {meta['admins']} admins, {meta['target']} @ {meta['commit']}: "
+          f"{report['requests']} requests in {report['elapsed_s']}s ({report['rps']} req/s), "
+          f"{report['completed_candidates']} completed, {report['lock_errors']} lock errors\n")
+    print(f"{'endpoint':42} {'reqs':>6} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'409':>5} {'lock':>5}")
+    for label, e in report["endpoints"].items():
+        line = (f"{label:42} {e['requests']:>6} {e['rps']:>7} {e['p50_ms']:>8} {e['p95_ms']:>8} "
+                f"{e['p99_ms']:>8} {e['conflicts']:>5} {e['lock_errors']:>5}")
+        old = (baseline or {}).get("endpoints", {}).get(label)
+        if old and old["p95_ms"]:
+            line += f"   p95 {(e['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100:+.0f}% vs {old['p95_ms']}"
+        print(line)
+    if baseline:
+        print(f"\nthroughput {report['rps']} req/s vs {baseline['rps']} "
+              f"(baseline {baseline['meta'].get('commit')}, {baseline['meta'].get('date')})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test with concurrent virtual candidates.")
+    parser.add_argument("--candidates", type=int, default=50, help="virtual candidates, all started at once")
+    parser.add_argument("--admins", type=int, default=2, help="admin users paging the evaluation list")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between answers")
+    parser.add_argument("--url", help="target a running server instead of the in-process app")
+    parser.add_argument("--db", help="SQLite file for the in-process app (default: temporary)")
+    parser.add_argument("--admin-pass", default=os.environ.get("ADMIN_PASS", "evamed2024"))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", help="write the report as JSON")
+    parser.add_argument("--compare", help="JSON report to compare against")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    if not args.url:
+        # Must be set before backend.database is imported
+        os.environ["DB_PATH"] = args.db or os.path.join(tempfile.mkdtemp(prefix="evamed-load-"), "load.db")
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    report = asyncio.run(run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
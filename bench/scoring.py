@@ -0,0 +1,273 @@
+"""
+Micro-benchmarks of the scoring and question-lookup functions.
+
+    python -m bench.scoring [--filter compute_results] [--min-time 0.1] [--repeat 7]
+                            [--save bench/scoring_baseline.json]
+                            [--compare bench/scoring_baseline.json] [--tolerance 0.2]
+
+Each case runs one function of backend.questions over a synthetic answer
+set drawn with a fixed seed: empty, partial (half the questions), full and
+re-answered (every question answered, a third of them twice, as the rows
+of an evaluation whose answers were changed). For each case the report
+gives ops/sec (median of --repeat timing runs of at least --min-time
+seconds each), the same speed relative to a fixed calibration loop timed
+alongside it, and, from tracemalloc, the blocks one call leaves allocated
+(its result) and the peak bytes it allocates.
+
+--compare prints raw and calibrated changes against a saved report and
+exits with status 1 when any case's calibrated speed falls more than
+--tolerance (a fraction, default 0.2) below the baseline, both in the
+report and when measured again (RECHECKS times). Calibration
+absorbs a busier or throttled machine, not a different CPU or Python
+version: make baselines where the gate runs.
+"""
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from backend.questions import (
+    QUESTION_BY_ID, QUESTIONS, TOTAL_QUESTIONS, UNANSWERED, answers_to_vector, compute_results,
+    compute_results_batch, compute_results_packed, get_next_unanswered, mask_from_ids, mask_from_packed,
+    next_unanswered_from_mask, pack_answers, score_vector, unanswered_from_mask, unpack_answers,
+)
+
+SEED = 1
+BATCH_SIZE = 100  # vectors per compute_results_batch call
+RECHECKS = 2  # extra measurements of a case that looks regressed before failing
+
+
+def answer_sets(rng: random.Random) -> dict[str, list[dict]]:
+    """{"question_id", "answer_value"} rows of each synthetic answer set."""
+    def row(q):
+        return {"question_id": q["id"], "answer_value": rng.choices((0, 1, 2), weights=(5, 3, 2))[0]}
+
+    full = [row(q) for q in QUESTIONS]
+    partial = [row(q) for q in QUESTIONS[: TOTAL_QUESTIONS // 2]]
+    changed = [row(q) for q in rng.sample(QUESTIONS, TOTAL_QUESTIONS // 3)]
+    return {
+        "empty": [],
+        "partial": partial,
+        "full": full,
+        "reanswered": full + changed,
+    }
+
+
+def build_cases(sets: dict[str, list[dict]], rng: random.Random) -> dict[str, tuple]:
+    """name → (function, args); the function is called as function(*args)."""
+    cases = {}
+    for name, rows in sets.items():
+        vector = answers_to_vector(rows)
+        packed = pack_answers(vector)
+        answered_ids = {r["question_id"] for r in rows}
+        mask = mask_from_ids(answered_ids)
+        cases |= {
+            f"compute_results/{name}": (compute_results, (rows,)),
+            f"answers_to_vector/{name}": (answers_to_vector, (rows,)),
+            f"score_vector/{name}": (score_vector, (vector,)),
+            f"compute_results_packed/{name}": (compute_results_packed, (packed,)),
+            f"pack_answers/{name}": (pack_answers, (vector,)),
+            f"unpack_answers/{name}": (unpack_answers, (packed,)),
+            f"mask_from_packed/{name}": (mask_from_packed, (packed,)),
+            f"get_next_unanswered/{name}": (get_next_unanswered, (answered_ids,)),
+            f"next_unanswered_from_mask/{name}": (next_unanswered_from_mask, (mask,)),
+            f"unanswered_from_mask/{name}": (unanswered_from_mask, (mask, 5)),
+        }
+
+    vectors = [
+        [rng.choice((UNANSWERED, 0, 1, 2)) if rng.random() < 0.2 else rng.randint(0, 2) for _ in QUESTIONS]
+        for _ in range(BATCH_SIZE)
+    ]
+    cases[f"compute_results_batch/{BATCH_SIZE}"] = (compute_results_batch, (vectors,))
+
+    ids = [q["id"] for q in QUESTIONS]
+    cases["QUESTION_BY_ID/all"] = (lambda: [QUESTION_BY_ID[i] for i in ids], ())
+    cases["QUESTIONS/scan"] = (lambda: [q for q in QUESTIONS if q["area"] == "aptitud"], ())
+    return cases
+
+
+def _calibration_loop():
+    """Fixed pure-Python work timed next to every case (see measure_speed)."""
+    total = 0
+    for i in range(1000):
+        total += i * i % 7
+    return total
+
+
+def _loops_for(fn, args, min_time: float) -> int:
+    """Calls of ``fn`` that take at least ``min_time`` seconds, like timeit.autorange."""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn(*args)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            return loops
+        loops = max(loops * 2, int(loops * min_time / elapsed * 1.1) if elapsed else loops * 10)
+
+
+def _rate(fn, args, loops: int) -> float:
+    started = time.perf_counter()
+    for _ in range(loops):
+        fn(*args)
+    return loops / (time.perf_counter() - started)
+
+
+def measure_speed(fn, args, min_time: float, repeat: int, calibration_loops: int) -> tuple[float, float]:
+    """
+    (ops/sec, ops per calibration-loop op), medians over ``repeat`` runs of
+    at least ``min_time`` seconds.
+
+    Each run of ``fn`` is followed by a run of _calibration_loop, and the
+    second figure is the median of their ratios: on a shared or throttled
+    machine both slow down together, so it moves far less between runs than
+    raw ops/sec does and is what --compare gates on.
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # like timeit: collections would land on random iterations
+    try:
+        loops = _loops_for(fn, args, min_time)
+        rates, ratios = [], []
+        for _ in range(repeat):
+            rate = _rate(fn, args, loops)
+            rates.append(rate)
+            ratios.append(rate / _rate(_calibration_loop, (), calibration_loops))
+        return statistics.median(rates), statistics.median(ratios)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def measure_allocations(fn, args) -> tuple[int, int]:
+    """(blocks alive after one call, peak bytes allocated during it), per tracemalloc."""
+    fn(*args)  # warm caches so only the call's own allocations are counted
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        result = fn(*args)
+        peak = tracemalloc.get_traced_memory()[1] - base
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    # Blocks still alive when the call returns: the result and what it references.
+    # Objects taken from CPython's free lists (small dicts, floats) aren't new blocks.
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    del result
+    return blocks, peak
+
+
+def run(args, only: list[str] | None = None) -> dict:
+    rng = random.Random(args.seed)
+    cases = build_cases(answer_sets(rng), rng)
+    calibration_loops = _loops_for(_calibration_loop, (), args.min_time / 2)
+    results = {}
+    for name, (fn, fn_args) in cases.items():
+        if (args.filter and args.filter not in name) or (only is not None and name not in only):
+            continue
+        ops, relative = measure_speed(fn, fn_args, args.min_time, args.repeat, calibration_loops)
+        blocks, peak = measure_allocations(fn, fn_args)
+        results[name] = {
+            "ops_per_sec": round(ops, 1),
+            "us_per_op": round(1e6 / ops, 3),
+            "relative": round(relative, 4),
+            "alloc_blocks": blocks,
+            "alloc_peak_bytes": peak,
+        }
+        print(f"  {name:42} {ops:>14,.0f} ops/s {1e6 / ops:>10.3f} µs {blocks:>6} blocks {peak:>9,} B",
+              file=sys.stderr)
+    return {
+        "cases": results,
+        "meta": {
+            "commit": _git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "min_time": args.min_time,
+            "repeat": args.repeat,
+        },
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print the change per case against ``baseline``. Returns the cases that regressed."""
+    print(f"{'case':42} {'ops/s':>14} {'baseline':>14} {'raw':>8} {'change':>8} {'blocks':>7}")
+    regressions = []
+    for name, case in report["cases"].items():
+        old = baseline["cases"].get(name)
+        if old is None:
+            print(f"{name:42} {case['ops_per_sec']:>14,.0f} {'-':>14}")
+            continue
+        raw = case["ops_per_sec"] / old["ops_per_sec"] - 1
+        change = case["relative"] / old["relative"] - 1
+        blocks = case["alloc_blocks"] - old["alloc_blocks"]
+        flag = ""
+        if change < -tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:42} {case['ops_per_sec']:>14,.0f} {old['ops_per_sec']:>14,.0f} "
+              f"{raw:>+8.1%} {change:>+8.1%} {blocks:>+7}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the scoring functions.")
+    parser.add_argument("--filter", help="only cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.1, help="seconds per timing run")
+    parser.add_argument("--repeat", type=int, default=7, help="timing runs per case (median is kept)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--save", help="write the report as JSON")
+    parser.add_argument("--compare", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed calibrated slowdown vs --compare before failing (fraction)")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        meta = baseline["meta"]
+        print(f"\nvs baseline {meta.get('commit')} ({meta.get('date')}, Python {meta.get('python')}), "
+              f"tolerance {args.tolerance:.0%}\n")
+        regressions = compare(report, baseline, args.tolerance)
+        for attempt in range(RECHECKS):
+            if not regressions:
+                break
+            # A single slow run is usually noise: measure those cases again, keep their best
+            print(f"\nRe-measuring {len(regressions)} case(s) ({attempt + 1}/{RECHECKS})...\n")
+            again = run(args, only=regressions)
+            for name, case in again["cases"].items():
+                if case["relative"] > report["cases"][name]["relative"]:
+                    report["cases"][name] = case
+            regressions = compare({"cases": {n: report["cases"][n] for n in regressions}}, baseline,
+                                  args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than the baseline by more than "
+                  f"{args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
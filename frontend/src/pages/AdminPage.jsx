@@ -17,6 +17,8 @@ const VERDICT_COLORS = {
   "NO APTO": { color: "var(--danger)", bg: "#fee2e2" },
 };
 
+const PAGE_SIZE = 50;
+
 const ROLE_LABELS = {
   admin: "Administrador completo",
   creator: "Solo creación",
@@ -41,11 +43,16 @@ export default function AdminPage() {
   const [userRole, setUserRole] = useState(null); // "admin" | "creator"
   const [displayName, setDisplayName] = useState("");
   const [currentUserId, setCurrentUserId] = useState(null);
+  const [sessionToken, setSessionToken] = useState(null);
   const [authError, setAuthError] = useState(false);
   const [authLoading, setAuthLoading] = useState(false);
 
   const [evaluations, setEvaluations] = useState([]);
   const [listLoading, setListLoading] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [filters, setFilters] = useState({ status: "", verdict: "", company: "" });
+  const [exporting, setExporting] = useState(null); // "csv" | "xlsx" while downloading
   const [copied, setCopied] = useState(null);
 
   // Active tab: "evaluations" | "users"
@@ -87,6 +94,7 @@ export default function AdminPage() {
       });
       const data = await r.json();
       if (data.ok) {
+        setSessionToken(data.token);
         setAuthed(true);
         setUserRole(data.role);
         setDisplayName(data.display_name || data.username);
@@ -99,20 +107,71 @@ export default function AdminPage() {
     }
   }
 
+  // fetch() with the session token; an expired or revoked session logs out
+  async function authFetch(url, options = {}) {
+    const r = await fetch(url, {
+      ...options,
+      headers: { ...options.headers, Authorization: `Bearer ${sessionToken}` },
+    });
+    if (r.status === 401) clearSession();
+    return r;
+  }
+
+  async function fetchPage(cursor) {
+    const params = new URLSearchParams({ limit: PAGE_SIZE });
+    Object.entries(filters).forEach(([k, v]) => { if (v.trim()) params.set(k, v.trim()); });
+    if (cursor) params.set("cursor", cursor);
+    const r = await authFetch(`/api/evaluations?${params}`);
+    return r.json();
+  }
+
   async function loadList() {
     setListLoading(true);
     try {
-      const r = await fetch("/api/evaluations");
-      setEvaluations(await r.json());
+      const page = await fetchPage(null);
+      setEvaluations(page.items);
+      setNextCursor(page.next_cursor);
     } finally {
       setListLoading(false);
     }
   }
 
+  async function loadMore() {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(nextCursor);
+      setEvaluations(prev => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
+  // Download every evaluation matching the current filters, with scores
+  async function exportList(format) {
+    const params = new URLSearchParams({ format });
+    Object.entries(filters).forEach(([k, v]) => { if (v.trim()) params.set(k, v.trim()); });
+    setExporting(format);
+    try {
+      const r = await authFetch(`/api/evaluations/export?${params}`);
+      if (!r.ok) return;
+      const name = /filename="([^"]+)"/.exec(r.headers.get("Content-Disposition") || "");
+      const url = URL.createObjectURL(await r.blob());
+      const a = document.createElement("a");
+      a.href = url;
+      a.download = name ? name[1] : `evaluaciones.${format}`;
+      a.click();
+      URL.revokeObjectURL(url);
+    } finally {
+      setExporting(null);
+    }
+  }
+
   async function loadUsers() {
     setUsersLoading(true);
     try {
-      const r = await fetch("/api/admin/users");
+      const r = await authFetch("/api/admin/users");
       setAdminUsers(await r.json());
     } finally {
       setUsersLoading(false);
@@ -126,13 +185,18 @@ export default function AdminPage() {
     }
   }, [authed, userRole]);
 
+  // Reload the first page whenever a dropdown filter changes
+  useEffect(() => {
+    if (authed) loadList();
+  }, [filters.status, filters.verdict]);
+
   async function createEval(e) {
     e.preventDefault();
     if (!form.candidate_name.trim()) return;
     setCreating(true);
     setCreatedLink(null);
     try {
-      const r = await fetch("/api/evaluations", {
+      const r = await authFetch("/api/evaluations", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify(form),
@@ -163,7 +227,7 @@ export default function AdminPage() {
     }
     setCreatingUser(true);
     try {
-      const r = await fetch("/api/admin/users", {
+      const r = await authFetch("/api/admin/users", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify(userForm),
@@ -187,7 +251,7 @@ export default function AdminPage() {
 
   async function handleDeleteUser(userId) {
     if (!confirm("¿Eliminar este usuario?")) return;
-    const r = await fetch(`/api/admin/users/${userId}`, { method: "DELETE" });
+    const r = await authFetch(`/api/admin/users/${userId}`, { method: "DELETE" });
     if (!r.ok) {
       const err = await r.json();
       alert(err.detail || "Error al eliminar");
@@ -203,6 +267,12 @@ export default function AdminPage() {
   }
 
   function logout() {
+    authFetch("/api/admin/logout", { method: "POST" }).catch(() => {});
+    clearSession();
+  }
+
+  function clearSession() {
+    setSessionToken(null);
     setAuthed(false);
     setUserRole(null);
     setDisplayName("");
@@ -568,8 +638,40 @@ export default function AdminPage() {
                       flex: 1,
                     }}
                   >
-                    📋 Evaluaciones ({evaluations.length})
+                    📋 Evaluaciones ({evaluations.length}{nextCursor ? "+" : ""})
                   </h2>
+                  <select
+                    className="input"
+                    style={{ width: "auto", fontSize: 12, padding: "6px 10px" }}
+                    value={filters.status}
+                    onChange={(e) => setFilters({ ...filters, status: e.target.value })}
+                  >
+                    <option value="">Todos los estados</option>
+                    {Object.entries(STATUS_LABELS).map(([k, label]) => (
+                      <option key={k} value={k}>{label}</option>
+                    ))}
+                  </select>
+                  {(userRole === "admin" || userRole === "evaluator") && (
+                    <select
+                      className="input"
+                      style={{ width: "auto", fontSize: 12, padding: "6px 10px" }}
+                      value={filters.verdict}
+                      onChange={(e) => setFilters({ ...filters, verdict: e.target.value })}
+                    >
+                      <option value="">Todos los resultados</option>
+                      {Object.keys(VERDICT_COLORS).map((v) => (
+                        <option key={v} value={v}>{v}</option>
+                      ))}
+                    </select>
+                  )}
+                  <input
+                    className="input"
+                    style={{ width: 140, fontSize: 12, padding: "6px 10px" }}
+                    placeholder="Empresa"
+                    value={filters.company}
+                    onChange={(e) => setFilters({ ...filters, company: e.target.value })}
+                    onKeyDown={(e) => { if (e.key === "Enter") loadList(); }}
+                  />
                   <button
                     className="btn btn-ghost"
                     style={{ fontSize: 12, padding: "6px 14px" }}
@@ -577,6 +679,26 @@ export default function AdminPage() {
                   >
                     {listLoading ? "..." : "↻ Actualizar"}
                   </button>
+                  {(userRole === "admin" || userRole === "evaluator") && (
+                    <>
+                      <button
+                        className="btn btn-ghost"
+                        style={{ fontSize: 12, padding: "6px 14px" }}
+                        disabled={exporting !== null}
+                        onClick={() => exportList("csv")}
+                      >
+                        {exporting === "csv" ? "..." : "⬇ CSV"}
+                      </button>
+                      <button
+                        className="btn btn-ghost"
+                        style={{ fontSize: 12, padding: "6px 14px" }}
+                        disabled={exporting !== null}
+                        onClick={() => exportList("xlsx")}
+                      >
+                        {exporting === "xlsx" ? "..." : "⬇ Excel"}
+                      </button>
+                    </>
+                  )}
                 </div>
 
                 {listLoading ? (
@@ -772,6 +894,18 @@ export default function AdminPage() {
                         })}
                       </tbody>
                     </table>
+                    {nextCursor && (
+                      <div style={{ padding: "16px 20px", textAlign: "center" }}>
+                        <button
+                          className="btn btn-ghost"
+                          style={{ fontSize: 12, padding: "6px 14px" }}
+                          onClick={loadMore}
+                          disabled={loadingMore}
+                        >
+                          {loadingMore ? "..." : "Cargar más"}
+                        </button>
+                      </div>
+                    )}
                   </div>
                 )}
               </div>
@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from "react";
+import { useState, useEffect, useCallback, useRef } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 
 const AREA_LABELS = {
@@ -15,20 +15,78 @@ const AREA_ICONS = {
   aptitud:      "🛡️",
 };
 
-async function fetchNext(token) {
-  const r = await fetch(`/api/eval/${token}/next-question`);
+// Answers queued locally before being sent together (batch mode)
+const BATCH_SIZE = 10;
+
+// Queue answers on slow or metered connections, or when forced with ?batch=1
+function isBatchMode() {
+  const c = navigator.connection;
+  if (new URLSearchParams(window.location.search).has("batch")) return true;
+  return !!(c && (c.saveData || ["slow-2g", "2g", "3g"].includes(c.effectiveType)));
+}
+
+function loadQueue(token) {
+  try {
+    return JSON.parse(localStorage.getItem(`evamed-queue-${token}`)) || [];
+  } catch {
+    return [];
+  }
+}
+
+function saveQueue(token, queue) {
+  if (queue.length) localStorage.setItem(`evamed-queue-${token}`, JSON.stringify(queue));
+  else localStorage.removeItem(`evamed-queue-${token}`);
+}
+
+// The question bank is fetched once per version (immutable, cached by the
+// browser); the API only sends question ids ("compact" responses).
+const banks = {};
+
+function fetchBank(version) {
+  if (!banks[version]) {
+    banks[version] = fetch(`/api/question-bank/${version}`).then(r => {
+      if (!r.ok) throw new Error("Error al cargar las preguntas");
+      return r.json();
+    }).then(bank => new Map(bank.questions.map(q => [q.id, q])));
+    banks[version].catch(() => delete banks[version]);
+  }
+  return banks[version];
+}
+
+// Replace question ids in a compact response with the questions themselves
+async function withQuestions(data) {
+  const byId = await fetchBank(data.bank_version);
+  return {
+    ...data,
+    next_question: byId.get(data.next_question_id) || null,
+    upcoming: (data.upcoming || []).map(id => byId.get(id)),
+  };
+}
+
+async function fetchNext(token, lookahead = 0) {
+  const r = await fetch(`/api/eval/${token}/next-question?compact=1&lookahead=${lookahead}`);
   if (!r.ok) throw new Error("Error al cargar la evaluación");
-  return r.json();
+  return withQuestions(await r.json());
+}
+
+async function postBatch(token, answers) {
+  const r = await fetch(`/api/eval/${token}/responses?compact=1&lookahead=${BATCH_SIZE}`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ answers }),
+  });
+  if (!r.ok) throw new Error("Error al guardar respuestas");
+  return withQuestions(await r.json());
 }
 
 async function postAnswer(token, question_id, answer_value) {
-  const r = await fetch(`/api/eval/${token}/response`, {
+  const r = await fetch(`/api/eval/${token}/response?compact=1`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify({ question_id, answer_value }),
   });
   if (!r.ok) throw new Error("Error al guardar respuesta");
-  return r.json();
+  return withQuestions(await r.json());
 }
 
 export default function EvalPage() {
@@ -43,11 +101,61 @@ export default function EvalPage() {
   const [animating, setAnimating] = useState(false);
   const [started, setStarted] = useState(false);
 
+  // Batch mode: upcoming[0] is the current question; answers wait in queueRef
+  const [batchMode] = useState(isBatchMode);
+  const [upcoming, setUpcoming] = useState([]);
+  const [flushFailed, setFlushFailed] = useState(false);
+  const queueRef = useRef(loadQueue(token));
+
+  // Send queued answers; the server reply becomes the new source of progress
+  const flush = useCallback(async () => {
+    const sent = queueRef.current;
+    if (!sent.length) return null;
+    setSaving(true);
+    try {
+      const result = await postBatch(token, sent);
+      queueRef.current = queueRef.current.slice(sent.length);
+      saveQueue(token, queueRef.current);
+      setFlushFailed(false);
+      const queued = new Set(queueRef.current.map(a => a.question_id));
+      const next = (result.upcoming || []).filter(q => !queued.has(q.id));
+      setUpcoming(next);
+      setEvalData(prev => prev && ({
+        ...prev,
+        evaluation: { ...prev.evaluation, status: result.status },
+        answered: result.answered + queueRef.current.length,
+        total: result.total,
+        next_question: next[0] || null,
+      }));
+      return result;
+    } catch {
+      setFlushFailed(true);  // answers stay queued on this device
+      return null;
+    } finally {
+      setSaving(false);
+    }
+  }, [token]);
+
+  useEffect(() => {
+    if (!batchMode) return;
+    const retry = () => flush();
+    window.addEventListener("online", retry);
+    return () => window.removeEventListener("online", retry);
+  }, [batchMode, flush]);
+
   const load = useCallback(async () => {
     try {
-      const data = await fetchNext(token);
+      const data = await fetchNext(token, batchMode ? BATCH_SIZE : 0);
       setEvalData(data);
       setSelected(null);
+      if (batchMode) setUpcoming(data.upcoming || []);
+      if (data.evaluation?.status === "completed") {
+        // Nothing more can be saved; answers still queued here were already sent
+        queueRef.current = [];
+        saveQueue(token, []);
+      } else if (batchMode && queueRef.current.length) {
+        await flush();  // left over from a previous visit
+      }
 
       if (data.evaluation?.status === "completed") {
         navigate(`/result/${token}`, { replace: true });
@@ -57,12 +165,36 @@ export default function EvalPage() {
     } finally {
       setLoading(false);
     }
-  }, [token, navigate]);
+  }, [token, navigate, batchMode, flush]);
 
   useEffect(() => { load(); }, [load]);
 
+  function handleQueuedAnswer(optionIndex) {
+    setSelected(optionIndex);
+    setTimeout(() => {
+      queueRef.current = [
+        ...queueRef.current,
+        { question_id: evalData.next_question.id, answer_value: optionIndex, answered_at: new Date().toISOString() },
+      ];
+      saveQueue(token, queueRef.current);
+      const rest = upcoming.slice(1);
+      const answered = evalData.answered + 1;
+      setAnimating(true);
+      setTimeout(() => {
+        setUpcoming(rest);
+        setEvalData(prev => ({ ...prev, answered, next_question: rest[0] || null }));
+        setSelected(null);
+        setAnimating(false);
+      }, 200);
+      if (queueRef.current.length >= BATCH_SIZE || rest.length === 0 || answered >= evalData.total) {
+        flush();
+      }
+    }, 350);
+  }
+
   async function handleAnswer(optionIndex) {
     if (saving || animating) return;
+    if (batchMode) return handleQueuedAnswer(optionIndex);
     setSelected(optionIndex);
 
     // Short delay for visual feedback, then save
@@ -276,6 +408,24 @@ export default function EvalPage() {
                   Guardando...
                 </div>
               )}
+              {flushFailed && !saving && (
+                <div style={{ textAlign: "center", marginTop: 20, color: "var(--text4)", fontSize: 13 }}>
+                  Sin conexión — tus respuestas se guardan en este dispositivo y se enviarán al reconectar.
+                </div>
+              )}
+            </div>
+          ) : flushFailed && !saving ? (
+            <div style={{ textAlign: "center", paddingTop: 40 }}>
+              <div style={{ fontSize: 40, marginBottom: 16 }}>📶</div>
+              <p style={{ color: "var(--text2)", marginBottom: 20 }}>
+                No pudimos enviar tus respuestas. Están guardadas en este dispositivo.
+              </p>
+              <button className="btn btn-primary" onClick={flush}>Reintentar</button>
+            </div>
+          ) : queueRef.current.length > 0 ? (
+            <div style={{ textAlign: "center", paddingTop: 40 }}>
+              <div className="spinner" />
+              <p style={{ color: "var(--text2)" }}>Guardando respuestas...</p>
             </div>
           ) : (
             <div style={{ textAlign: "center", paddingTop: 40 }}>
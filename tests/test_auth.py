@@ -0,0 +1,137 @@
+"""Admin login, passwords and sessions: signed tokens, roles and revocation."""
+import hashlib
+import json
+
+import pytest
+from sqlalchemy import select
+
+from backend import auth
+from backend.auth import create_session, hash_password, needs_rehash
+from backend.models import AdminUser
+
+pytestmark = pytest.mark.anyio
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def add_user(username: str, password: str, role: str = "admin", password_hash: str | None = None) -> int:
+    import backend.database
+
+    async with backend.database.SessionLocal() as db:
+        user = AdminUser(username=username, password_hash=password_hash or hash_password(password), role=role)
+        db.add(user)
+        await db.commit()
+        return user.id
+
+
+async def login(client, username: str, password: str) -> dict:
+    response = await client.post("/api/admin/auth", json={"username": username, "password": password})
+    assert response.status_code == 200
+    return response.json()
+
+
+def forged(token: str, **claims) -> str:
+    """``token`` with its claims changed and the original signature."""
+    payload, signature = token.split(".")
+    data = json.loads(auth._b64decode(payload)) | claims
+    return f"{auth._b64encode(json.dumps(data).encode())}.{signature}"
+
+
+async def test_invalid_sessions_are_rejected(database, client, monkeypatch):
+    creator, _ = create_session(1, "creator")
+    monkeypatch.setattr(auth, "SESSION_TTL_HOURS", -1)
+    expired, _ = create_session(1, "admin")
+
+    for headers in (
+        {},
+        {"Authorization": "Bearer"},
+        {"Authorization": "Bearer not-a-token"},
+        {"Authorization": f"Basic {creator}"},
+        bearer(forged(creator, role="admin")),
+        bearer(forged(creator, exp=4102444800)),
+        bearer(creator[:-2] + "xx"),
+        bearer(expired),
+    ):
+        response = await client.get("/api/evaluations", headers=headers)
+        assert response.status_code == 401, headers
+        assert response.headers["www-authenticate"] == "Bearer"
+
+
+@pytest.mark.parametrize("path, allowed", [
+    ("/api/evaluations", {"admin", "creator", "evaluator"}),
+    ("/api/evaluations/export", {"admin", "evaluator"}),
+    ("/api/admin/users", {"admin"}),
+    ("/api/admin/stats", {"admin"}),
+])
+async def test_roles(database, client, path, allowed):
+    for role in auth.ROLES:
+        token, _ = create_session(1, role)
+        response = await client.get(path, headers=bearer(token))
+        assert response.status_code == (200 if role in allowed else 403), role
+
+
+async def test_logout_revokes_the_session(database, client):
+    await add_user("ana", "clave-segura")
+    first = await login(client, "ana", "clave-segura")
+    second = await login(client, "ana", "clave-segura")
+
+    response = await client.post("/api/admin/logout", headers=bearer(first["token"]))
+    assert response.status_code == 200
+    response = await client.get("/api/evaluations", headers=bearer(first["token"]))
+    assert response.status_code == 401
+    response = await client.post("/api/admin/logout", headers=bearer(first["token"]))
+    assert response.status_code == 401
+
+    # Other sessions of the same user stay valid
+    response = await client.get("/api/evaluations", headers=bearer(second["token"]))
+    assert response.status_code == 200
+
+
+async def test_deleted_user_loses_its_sessions(database, client):
+    admin_id = await add_user("admin", "clave-admin")
+    admin_headers = bearer(create_session(admin_id, "admin")[0])
+    user_id = await add_user("beto", "otra-clave", role="evaluator")
+    session = await login(client, "beto", "otra-clave")
+    response = await client.get("/api/evaluations", headers=bearer(session["token"]))
+    assert response.status_code == 200
+
+    response = await client.delete(f"/api/admin/users/{user_id}", headers=admin_headers)
+    assert response.status_code == 200
+    response = await client.get("/api/evaluations", headers=bearer(session["token"]))
+    assert response.status_code == 401
+    assert await login(client, "beto", "otra-clave") == {"ok": False}
+
+
+async def stored_hash(username: str) -> str:
+    import backend.database
+
+    async with backend.database.SessionLocal() as db:
+        return (await db.execute(select(AdminUser.password_hash).where(AdminUser.username == username))).scalar()
+
+
+@pytest.mark.parametrize("kdf, prefix", [("scrypt", "scrypt$"), ("pbkdf2", "pbkdf2_sha256$1000$")])
+async def test_legacy_hash_is_upgraded_on_login(database, client, monkeypatch, kdf, prefix):
+    monkeypatch.setattr(auth, "PASSWORD_KDF", kdf)
+    monkeypatch.setattr(auth, "PBKDF2_ITERATIONS", 1000)
+    legacy = "a1b2c3:" + hashlib.sha256(b"a1b2c3clave-vieja").hexdigest()
+    await add_user("carla", "clave-vieja", password_hash=legacy)
+
+    assert (await login(client, "carla", "clave-vieja"))["ok"] is True
+    upgraded = await stored_hash("carla")
+    assert upgraded.startswith(prefix)
+    assert not needs_rehash(upgraded)
+
+    assert (await login(client, "carla", "clave-vieja"))["ok"] is True
+    assert await stored_hash("carla") == upgraded  # no rehash once current
+    assert await login(client, "carla", "clave-nueva") == {"ok": False}
+
+
+async def test_failed_logins_look_the_same(database, client):
+    await add_user("dora", "clave-correcta")
+    unknown = await client.post("/api/admin/auth", json={"username": "nadie", "password": "clave-correcta"})
+    wrong = await client.post("/api/admin/auth", json={"username": "dora", "password": "otra"})
+    assert unknown.status_code == wrong.status_code == 200
+    assert unknown.json() == wrong.json() == {"ok": False}
+    assert (await login(client, "dora", "clave-correcta"))["ok"] is True
@@ -0,0 +1,35 @@
+"""Background jobs keep running when one of them fails."""
+import pytest
+
+from backend import leader, main
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_failed_job_is_retried(database, monkeypatch):
+    monkeypatch.setattr(leader, "LEASE_TTL", 0.3)
+    calls = []
+
+    async def job():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return "done"
+
+    assert await leader.run_as_leader("test-job", job) == "done"
+    assert len(calls) == 2
+
+
+async def test_cleanup_runs_when_backfill_fails(monkeypatch):
+    cleanups = []
+
+    async def failing_backfill():
+        raise RuntimeError("duplicate key")
+
+    async def cleanup():
+        cleanups.append(1)
+
+    monkeypatch.setattr(main, "backfill_results", failing_backfill)
+    monkeypatch.setattr(main, "cleanup_expired_evaluations", cleanup)
+    await main.background_jobs()
+    assert cleanups == [1]
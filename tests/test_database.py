@@ -0,0 +1,112 @@
+"""Backend-specific SQL: migrations, the answer upsert and keyset pagination."""
+import asyncio
+
+import pytest
+from sqlalchemy import select, text
+
+from backend import database as db_module
+from backend.database import async_url
+from backend.migrations import SCHEMA_VERSION, _lock, current_version, migrate
+from backend.models import Evaluation, Response
+from backend.questions import QUESTIONS, unpack_answers
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("postgres://u:p@host/db", "postgresql+asyncpg://u:p@host/db"),
+    ("postgresql://u:p@host/db", "postgresql+asyncpg://u:p@host/db"),
+    ("postgresql+asyncpg://u:p@host/db", "postgresql+asyncpg://u:p@host/db"),
+    ("sqlite+aiosqlite:///evamed.db", "sqlite+aiosqlite:///evamed.db"),
+])
+def test_async_url(url, expected):
+    assert async_url(url) == expected
+
+
+async def test_migrate_is_idempotent(database):
+    async with database.connect() as conn:
+        assert await current_version(conn) == SCHEMA_VERSION
+    assert await migrate() == 0
+
+    # Every step must also work on a schema that already has its changes
+    async with database.begin() as conn:
+        await conn.execute(text("UPDATE schema_version SET version = 0"))
+    assert await migrate() == SCHEMA_VERSION
+    async with database.connect() as conn:
+        assert await current_version(conn) == SCHEMA_VERSION
+
+
+async def test_concurrent_migrations_run_once(database):
+    async with database.begin() as conn:
+        await conn.execute(text("DROP TABLE schema_version"))
+    applied = await asyncio.gather(*(migrate() for _ in range(4)))
+    assert sorted(applied) == [0, 0, 0, SCHEMA_VERSION]
+
+
+async def test_migrate_waits_for_a_long_migration(database, monkeypatch):
+    # Hold the migration lock for longer than SQLite's busy_timeout
+    monkeypatch.setitem(db_module.SQLITE_PRAGMAS, "busy_timeout", 100)
+    await database.dispose()
+    async with database.begin() as conn:
+        await conn.execute(text("UPDATE schema_version SET version = 0"))
+
+    async with database.connect() as holder:
+        await _lock(holder)
+        waiting = asyncio.create_task(migrate())
+        await asyncio.sleep(1.5)
+        assert not waiting.done()
+        await holder.commit()
+    assert await waiting == SCHEMA_VERSION
+
+
+async def create_evaluation(client, headers, name: str = "Ana Pérez") -> str:
+    response = await client.post("/api/evaluations", json={"candidate_name": name}, headers=headers)
+    assert response.status_code == 200
+    return response.json()["token"]
+
+
+async def test_answer_upsert_keeps_one_row_per_question(database, client, admin_headers):
+    token = await create_evaluation(client, admin_headers)
+    question_id = QUESTIONS[0]["id"]
+
+    for value in (0, 2):
+        response = await client.post(
+            f"/api/eval/{token}/response", json={"question_id": question_id, "answer_value": value}
+        )
+        assert response.status_code == 200
+        assert response.json()["answered"] == 1
+
+    async with database.connect() as conn:
+        ev = (await conn.execute(select(Evaluation).where(Evaluation.token == token))).one()
+        rows = (await conn.execute(
+            select(Response.question_id, Response.answer_value).where(Response.evaluation_id == ev.id)
+        )).all()
+    assert [tuple(r) for r in rows] == [(question_id, 2)]
+    assert ev.answered_count == 1
+    assert unpack_answers(ev.answers_packed)[0] == 2
+
+
+@pytest.mark.parametrize("sort", ["-created_at", "candidate_name", "-candidate_name"])
+async def test_keyset_pagination_walks_every_row_once(database, client, admin_headers, sort):
+    # Repeated names make the id tie-breaker matter
+    names = ["Beto", "Ana", "Carla", "Ana", "Beto", "Ana", "Dora"]
+    for name in names:
+        await create_evaluation(client, admin_headers, name)
+
+    listed, cursor = [], None
+    while True:
+        params = {"limit": 3, "sort": sort, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/api/evaluations", params=params, headers=admin_headers)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 3
+        listed += page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    ids = [item["id"] for item in listed]
+    assert len(ids) == len(set(ids)) == len(names)
+    key = sort.lstrip("-")
+    expected = sorted(listed, key=lambda item: (item[key], item["id"]), reverse=sort.startswith("-"))
+    assert ids == [item["id"] for item in expected]
@@ -0,0 +1,124 @@
+"""The admin list must not issue queries per evaluation (N+1)."""
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.auth import create_session
+from backend.questions import QUESTIONS, compute_results_packed, mask_from_packed, pack_answers, pack_mask
+from backend.result_store import result_row
+from backend.models import Evaluation
+from conftest import count_queries
+
+pytestmark = pytest.mark.anyio
+
+N = 5
+
+
+async def seed(count: int):
+    """
+    ``count`` evaluations cycling through pending, in progress, completed
+    with a stored result and completed without one (materialized by the list).
+    """
+    import backend.database
+
+    rng = random.Random(count)
+    start = datetime.now(timezone.utc) - timedelta(days=1)
+    async with backend.database.SessionLocal() as db:
+        evs = []
+        for i in range(count):
+            kind = i % 4
+            answered = 0 if kind == 0 else len(QUESTIONS) // 2 if kind == 1 else len(QUESTIONS)
+            vector = [rng.randint(0, 2) if j < answered else -1 for j in range(len(QUESTIONS))]
+            packed = pack_answers(vector) if answered else None
+            evs.append(Evaluation(
+                token=str(uuid.uuid4()),
+                candidate_name=f"Candidato {i}",
+                status=("pending", "in_progress", "completed", "completed")[kind],
+                answered_count=answered,
+                answers_packed=packed,
+                answered_mask=pack_mask(mask_from_packed(packed)) if packed else None,
+                created_at=start + timedelta(seconds=i),
+                completed_at=start + timedelta(seconds=i) if kind >= 2 else None,
+            ))
+        db.add_all(evs)
+        await db.flush()
+        db.add_all(
+            result_row(ev.id, compute_results_packed(ev.answers_packed), ev.answered_count)
+            for i, ev in enumerate(evs) if i % 4 == 2
+        )
+        await db.commit()
+
+
+async def list_queries(client, engine, headers) -> tuple[list[str], int]:
+    """(statements run by one page of the list, evaluations listed)"""
+    with count_queries(engine) as statements:
+        response = await client.get("/api/evaluations", params={"limit": 200}, headers=headers)
+    assert response.status_code == 200
+    return statements, len(response.json()["items"])
+
+
+async def test_list_query_count_does_not_grow_with_evaluations(database, client, admin_headers):
+    await seed(N)
+    small, listed = await list_queries(client, database, admin_headers)
+    assert listed == N
+
+    # Ten times more rows; the new completed ones without a result are
+    # materialized by this call as the first N were by the previous one
+    await seed(10 * N)
+    large, listed = await list_queries(client, database, admin_headers)
+    assert listed == 11 * N
+
+    assert len(large) == len(small), "\n".join(large)
+
+
+async def test_list_materializes_missing_results_once(database, client, admin_headers):
+    await seed(4 * N)
+    first = await client.get("/api/evaluations", params={"limit": 200}, headers=admin_headers)
+    with count_queries(database) as statements:
+        second = await client.get("/api/evaluations", params={"limit": 200}, headers=admin_headers)
+    assert first.json() == second.json()
+    assert not any(s.lstrip().upper().startswith("INSERT") for s in statements)
+
+
+@pytest.mark.parametrize("role, sees_results", [("admin", True), ("evaluator", True), ("creator", False)])
+async def test_scores_only_for_result_roles(database, client, role, sees_results):
+    await seed(4)
+    token, _ = create_session(2, role)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.get("/api/evaluations", headers=headers)
+    assert response.status_code == 200
+    completed = [item for item in response.json()["items"] if item["status"] == "completed"]
+    assert completed
+    for item in completed:
+        assert ("overall_pct" in item and "verdict" in item) == sees_results
+
+    for params in ({"verdict": "APTO"}, {"fields": "id,overall_pct"}, {"fields": "verdict"}):
+        response = await client.get("/api/evaluations", params=params, headers=headers)
+        assert response.status_code == (200 if sees_results else 403), params
+    response = await client.get("/api/evaluations", params={"fields": "id,status"}, headers=headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("tz", [
+    None, timezone.utc, timezone(timedelta(hours=-5)), timezone(timedelta(hours=9, minutes=30)),
+])
+async def test_created_range_honours_utc_offset(database, client, admin_headers, tz):
+    await seed(1)
+    response = await client.get("/api/evaluations", headers=admin_headers)
+    created = datetime.fromisoformat(response.json()["items"][0]["created_at"]).replace(tzinfo=None)
+
+    def at(moment: datetime) -> str:
+        """``moment`` (naive UTC) in ``tz``; naive when tz is None."""
+        return (moment if tz is None else moment.replace(tzinfo=timezone.utc).astimezone(tz)).isoformat()
+
+    for params, listed in (
+        ({"created_from": at(created - timedelta(minutes=1))}, 1),
+        ({"created_from": at(created + timedelta(hours=1))}, 0),
+        ({"created_to": at(created + timedelta(minutes=1))}, 1),
+        ({"created_to": at(created - timedelta(hours=1))}, 0),
+    ):
+        response = await client.get("/api/evaluations", params=params, headers=admin_headers)
+        assert len(response.json()["items"]) == listed, params
@@ -0,0 +1,39 @@
+"""backend.pack_answers while the app keeps taking answers."""
+import pytest
+from sqlalchemy import select, update
+
+from backend import pack_answers
+from backend.models import Evaluation
+from backend.questions import QUESTIONS, UNANSWERED, unpack_answers
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_pack_keeps_answers_saved_meanwhile(database, client, admin_headers, monkeypatch, capsys):
+    tokens = []
+    for name in ("Ana Pérez", "Beto Ruiz"):
+        response = await client.post("/api/evaluations", json={"candidate_name": name}, headers=admin_headers)
+        tokens.append(response.json()["token"])
+        answer = {"question_id": QUESTIONS[0]["id"], "answer_value": 1}
+        await client.post(f"/api/eval/{tokens[-1]}/response", json=answer)
+    async with database.begin() as conn:  # as stored before answers were packed
+        await conn.execute(update(Evaluation).values(answers_packed=None, answered_mask=None))
+
+    load_answer_vectors = pack_answers.load_answer_vectors
+
+    async def answer_while_loading(db, ids):
+        vectors = await load_answer_vectors(db, ids)
+        answer = {"question_id": QUESTIONS[1]["id"], "answer_value": 2}
+        await client.post(f"/api/eval/{tokens[0]}/response", json=answer)
+        return vectors
+
+    monkeypatch.setattr(pack_answers, "load_answer_vectors", answer_while_loading)
+    assert await pack_answers.pack_all() == 1
+    assert "1 evaluation(s) packed, 1 skipped" in capsys.readouterr().out
+
+    async with database.connect() as conn:
+        raced, other = (await conn.execute(select(Evaluation).order_by(Evaluation.id))).all()
+    assert unpack_answers(raced.answers_packed)[:3] == [1, 2, UNANSWERED]
+    assert raced.answered_count == 2
+    assert unpack_answers(other.answers_packed)[:2] == [1, UNANSWERED]
+    assert other.answered_count == 1
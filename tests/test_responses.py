@@ -0,0 +1,41 @@
+"""Saving answers: batches resent after a lost response."""
+import pytest
+
+from backend.questions import QUESTIONS
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_resent_final_batch_succeeds(client, admin_headers):
+    response = await client.post("/api/evaluations", json={"candidate_name": "Ana Pérez"}, headers=admin_headers)
+    token = response.json()["token"]
+    url = f"/api/eval/{token}/responses"
+
+    await client.post(url, json={"answers": [{"question_id": QUESTIONS[0]["id"], "answer_value": 1}]})
+    final = {"answers": [{"question_id": q["id"], "answer_value": 2} for q in QUESTIONS]}
+    first = await client.post(url, json=final, params={"compact": 1})
+    assert first.status_code == 200
+    assert first.json()["status"] == "completed"
+
+    again = await client.post(url, json=final, params={"compact": 1})
+    assert again.status_code == 200
+    assert again.json() == first.json()
+
+    # Part of it, or its last answer alone
+    again = await client.post(url, json={"answers": final["answers"][-3:]})
+    assert again.status_code == 200
+    assert again.json()["answered"] == len(QUESTIONS)
+    again = await client.post(f"/api/eval/{token}/response", json=final["answers"][-1])
+    assert again.status_code == 200
+
+
+async def test_completed_evaluation_rejects_changed_answers(client, admin_headers):
+    response = await client.post("/api/evaluations", json={"candidate_name": "Ana Pérez"}, headers=admin_headers)
+    token = response.json()["token"]
+    url = f"/api/eval/{token}/responses"
+    await client.post(url, json={"answers": [{"question_id": q["id"], "answer_value": 0} for q in QUESTIONS]})
+
+    changed = {"question_id": QUESTIONS[5]["id"], "answer_value": 1}
+    response = await client.post(f"/api/eval/{token}/response", json=changed)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "La evaluación ya fue completada"
@@ -0,0 +1,41 @@
+"""Materialized results."""
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from backend import result_store
+from backend.models import Evaluation, EvaluationResult
+from backend.questions import QUESTIONS, compute_results_packed, pack_answers
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_backfill_survives_a_concurrent_materialization(database, monkeypatch):
+    packed = pack_answers([i % 3 for i in range(len(QUESTIONS))])
+    async with result_store.SessionLocal() as db:
+        evs = [
+            Evaluation(token=str(uuid.uuid4()), candidate_name=f"C{i}", status="completed",
+                       answered_count=len(QUESTIONS), answers_packed=packed)
+            for i in range(3)
+        ]
+        db.add_all(evs)
+        await db.commit()
+
+    materialize_results = result_store.materialize_results
+    raced = []
+
+    async def list_stores_one_first(db, pending):
+        # What list_evaluations does for the same rows, committed in between
+        if not raced:
+            raced.append(pending[0].id)
+            async with result_store.SessionLocal() as other:
+                other.add(result_store.result_row(pending[0].id, compute_results_packed(packed), len(QUESTIONS)))
+                await other.commit()
+        return await materialize_results(db, pending)
+
+    monkeypatch.setattr(result_store, "materialize_results", list_stores_one_first)
+    assert await result_store.backfill_results() == 2
+
+    async with database.connect() as conn:
+        assert (await conn.execute(select(func.count()).select_from(EvaluationResult))).scalar() == 3
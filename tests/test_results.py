@@ -0,0 +1,64 @@
+"""Conditional requests and caching of GET /api/result/{token}."""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+import pytest
+from sqlalchemy import update
+
+from backend.models import EvaluationResult
+from backend.questions import QUESTIONS
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def completed(client, admin_headers) -> str:
+    """Token of a completed evaluation."""
+    response = await client.post("/api/evaluations", json={"candidate_name": "Ana Pérez"}, headers=admin_headers)
+    token = response.json()["token"]
+    answers = [{"question_id": q["id"], "answer_value": i % 3} for i, q in enumerate(QUESTIONS)]
+    response = await client.post(f"/api/eval/{token}/responses", json={"answers": answers}, params={"compact": 1})
+    assert response.json()["status"] == "completed"
+    return token
+
+
+async def test_if_none_match(client, completed):
+    first = await client.get(f"/api/result/{completed}")
+    assert first.status_code == 200
+
+    for value in (first.headers["etag"], f'"other", W/{first.headers["etag"]}', "*"):
+        response = await client.get(f"/api/result/{completed}", headers={"If-None-Match": value})
+        assert response.status_code == 304, value
+    response = await client.get(f"/api/result/{completed}", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("offset", ["GMT", "+0000", "-0000"])
+async def test_if_modified_since(client, completed, offset):
+    first = await client.get(f"/api/result/{completed}")
+    last_modified = parsedate_to_datetime(first.headers["last-modified"])
+
+    since = format_datetime(last_modified, usegmt=True).replace("GMT", offset)
+    response = await client.get(f"/api/result/{completed}", headers={"If-Modified-Since": since})
+    assert response.status_code == 304
+
+    earlier = format_datetime(last_modified - timedelta(seconds=1), usegmt=True).replace("GMT", offset)
+    response = await client.get(f"/api/result/{completed}", headers={"If-Modified-Since": earlier})
+    assert response.status_code == 200
+
+
+async def test_rescored_result_is_not_served_from_cache(database, client, completed):
+    first = await client.get(f"/api/result/{completed}")
+    assert first.json()["overall_pct"] != 12.5
+
+    # What backend.rescore writes when the scoring rules changed
+    async with database.begin() as conn:
+        await conn.execute(update(EvaluationResult).values(
+            overall_pct=12.5, computed_at=datetime.now(timezone.utc) + timedelta(seconds=1),
+        ))
+
+    second = await client.get(f"/api/result/{completed}", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.json()["overall_pct"] == 12.5
+    assert second.headers["etag"] != first.headers["etag"]
+    assert second.headers["last-modified"] != first.headers["last-modified"]